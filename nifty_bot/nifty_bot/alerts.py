@@ -6,16 +6,23 @@
 Alerts: Telegram Bot & Message Formatting
 """
 
+import asyncio
+import itertools
 import logging
+import time as time_module
+from dataclasses import dataclass
 
 try:
     from telegram import Bot
-    from telegram.error import TelegramError
+    from telegram.error import TelegramError, BadRequest
     TELEGRAM_AVAILABLE = True
 except ImportError:
     TELEGRAM_AVAILABLE = False
 
-from config import TELEGRAM_ENABLED, TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID
+from config import (TELEGRAM_ENABLED, TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, ALERT_QUEUE_SIZE,
+                    ALERT_RATE_LIMIT, ALERT_MAX_ATTEMPTS, ALERT_RETRY_BASE, ALERT_FLUSH_SECONDS)
+from ratelimit import RateLimiter
+from metrics import ALERT_SECONDS, ALERT_DROPPED
 from utils import setup_logger
 
 logger = setup_logger("alerts")
@@ -45,17 +52,21 @@ class TelegramBot:
                     logger.error(f"❌ Telegram init failed: {e}")
                     self.enabled = False
     
+    async def deliver(self, message, parse_mode='HTML'):
+        """Send message, raising on failure (for callers that retry)"""
+        await self.bot.send_message(
+            chat_id=self.chat_id,
+            text=message,
+            parse_mode=parse_mode
+        )
+    
     async def send(self, message, parse_mode='HTML'):
         """Send message"""
         if not self.enabled or not self.bot:
             return False
         
         try:
-            await self.bot.send_message(
-                chat_id=self.chat_id,
-                text=message,
-                parse_mode=parse_mode
-            )
+            await self.deliver(message, parse_mode)
             return True
         except TelegramError as e:
             logger.error(f"❌ Telegram send failed: {e}")
@@ -64,25 +75,199 @@ class TelegramBot:
             logger.error(f"❌ Unexpected error: {e}")
             return False
     
+    @staticmethod
+    def signal_text(message):
+        return f"🔔 <b>TRADING SIGNAL</b>\n\n{message}"
+    
+    @staticmethod
+    def exit_text(message):
+        return f"🚪 <b>EXIT SIGNAL</b>\n\n{message}"
+    
+    @staticmethod
+    def update_text(message):
+        return f"📊 <b>Market Update</b>\n\n{message}"
+    
     async def send_signal(self, message):
         """Send entry signal alert"""
-        formatted = f"🔔 <b>TRADING SIGNAL</b>\n\n{message}"
-        return await self.send(formatted)
+        return await self.send(self.signal_text(message))
     
     async def send_exit(self, message):
         """Send exit alert"""
-        formatted = f"🚪 <b>EXIT SIGNAL</b>\n\n{message}"
-        return await self.send(formatted)
+        return await self.send(self.exit_text(message))
     
     async def send_update(self, message):
         """Send update"""
-        formatted = f"📊 <b>Market Update</b>\n\n{message}"
-        return await self.send(formatted)
+        return await self.send(self.update_text(message))
     
     def is_enabled(self):
         return self.enabled and self.bot is not None
 
 
+# ==================== Alert Dispatcher ====================
+PRIORITY_TRADE = 0  # entry/exit
+PRIORITY_INFO = 1
+PRIORITY_UPDATE = 2
+
+
+@dataclass
+class Alert:
+    text: str
+    priority: int
+    seq: int
+    key: str = None  # pending alerts with the same key are coalesced
+    attempts: int = 0
+    ready_at: float = 0.0
+
+
+class AlertDispatcher:
+    """Background Telegram sender so a slow send never holds up a cycle
+    
+    `send*` only enqueue. One worker delivers the best ready alert
+    (priority, then age) within the chat's rate limit and retries
+    failures with exponential back-off. A newer alert with the same `key`
+    replaces a pending one. Only trade alerts may exceed ALERT_QUEUE_SIZE.
+    """
+    
+    def __init__(self, telegram, limiter=None):
+        self.telegram = telegram
+        self.limiter = limiter or RateLimiter({'default': ALERT_RATE_LIMIT})
+        self.pending = []
+        self.keyed = {}
+        self.seq = itertools.count()
+        self.wakeup = asyncio.Event()
+        self.worker = None
+        self.busy = False
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+    
+    def start(self):
+        if self.worker is None:
+            self.worker = asyncio.create_task(self._run())
+    
+    def send(self, message, priority=PRIORITY_INFO, key=None):
+        """Queue a message; returns False if Telegram is off or it was dropped"""
+        if not self.telegram.is_enabled():
+            return False
+        
+        if key is not None and key in self.keyed:
+            alert = self.keyed[key]
+            alert.text, alert.attempts, alert.ready_at = message, 0, 0.0
+            self.coalesced += 1
+            return True
+        
+        if priority > PRIORITY_TRADE and len(self.pending) >= ALERT_QUEUE_SIZE:
+            self.dropped += 1
+            ALERT_DROPPED.inc('queue_full')
+            logger.warning("⚠️ Alert queue full, dropping message")
+            return False
+        
+        alert = Alert(message, priority, next(self.seq), key)
+        self.pending.append(alert)
+        if key is not None:
+            self.keyed[key] = alert
+        self.wakeup.set()
+        return True
+    
+    def send_signal(self, message):
+        return self.send(self.telegram.signal_text(message), PRIORITY_TRADE)
+    
+    def send_exit(self, message):
+        return self.send(self.telegram.exit_text(message), PRIORITY_TRADE)
+    
+    def send_update(self, message, key='update'):
+        return self.send(self.telegram.update_text(message), PRIORITY_UPDATE, key)
+    
+    def _next_ready(self):
+        """Pop the best alert that is due; else (None, seconds until one is)"""
+        now = time_module.monotonic()
+        ready = [a for a in self.pending if a.ready_at <= now]
+        if not ready:
+            wait = min((a.ready_at for a in self.pending), default=None)
+            return None, None if wait is None else wait - now
+        
+        alert = min(ready, key=lambda a: (a.priority, a.seq))
+        self.pending.remove(alert)
+        if alert.key is not None:
+            self.keyed.pop(alert.key, None)
+        return alert, 0
+    
+    async def _run(self):
+        while True:
+            alert, wait = self._next_ready()
+            if alert is None:
+                self.wakeup.clear()
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self.busy = True
+            try:
+                await self._deliver(alert)
+            finally:
+                self.busy = False
+    
+    async def _deliver(self, alert):
+        await self.limiter.acquire('default')
+        start = time_module.perf_counter()
+        try:
+            await self.telegram.deliver(alert.text)
+            ALERT_SECONDS.observe(time_module.perf_counter() - start, 'ok')
+            self.sent += 1
+            return
+        except Exception as e:
+            ALERT_SECONDS.observe(time_module.perf_counter() - start, 'error')
+            error = e
+        
+        alert.attempts += 1
+        retry_after = getattr(error, 'retry_after', None)
+        if retry_after is not None:
+            retry_after = getattr(retry_after, 'total_seconds', lambda: retry_after)()
+            self.limiter.observe('default', 429, {'Retry-After': retry_after})
+        
+        permanent = TELEGRAM_AVAILABLE and isinstance(error, BadRequest)
+        if permanent or alert.attempts >= ALERT_MAX_ATTEMPTS:
+            self.dropped += 1
+            ALERT_DROPPED.inc('failed')
+            logger.error(f"❌ Telegram send failed ({alert.attempts} attempts): {error}")
+            return
+        
+        delay = retry_after or ALERT_RETRY_BASE * 2 ** (alert.attempts - 1)
+        logger.warning(f"⚠️ Telegram send failed, retry in {delay:.1f}s: {error}")
+        
+        # Re-queue unless a newer alert with the same key arrived meanwhile
+        if alert.key is not None and alert.key in self.keyed:
+            return
+        alert.ready_at = time_module.monotonic() + delay
+        self.pending.append(alert)
+        if alert.key is not None:
+            self.keyed[alert.key] = alert
+    
+    async def close(self, deadline=ALERT_FLUSH_SECONDS):
+        """Flush pending alerts for up to `deadline` seconds, then stop"""
+        if self.worker is None:
+            return
+        
+        end = time_module.monotonic() + deadline
+        while (self.pending or self.busy) and time_module.monotonic() < end:
+            await asyncio.sleep(0.05)
+        
+        self.worker.cancel()
+        try:
+            await self.worker
+        except asyncio.CancelledError:
+            pass
+        self.worker = None
+        
+        if self.pending:
+            self.dropped += len(self.pending)
+            ALERT_DROPPED.inc('shutdown', amount=len(self.pending))
+            logger.warning(f"⚠️ {len(self.pending)} alert(s) not sent before shutdown")
+            self.pending.clear()
+            self.keyed.clear()
+
+
 # ==================== Message Formatter ====================
 class MessageFormatter:
     """Format Telegram messages"""
@@ -1,4 +1,4 @@
- ═══════════════════════════════════════════════════════════════════════════════
+# ═══════════════════════════════════════════════════════════════════════════════
 # FILE 4: analyzers.py (350 lines)
 # ═══════════════════════════════════════════════════════════════════════════════
 
@@ -7,23 +7,46 @@ Market Analyzers: OI, Volume, Technical, Market Structure
 All analysis functions in one place
 """
 
-import pandas as pd
+import numpy as np
+from collections import deque
 from datetime import datetime
 from config import *
-from utils import IST, setup_logger
+from utils import setup_logger, get_ist_time
+from chain_snapshot import ChainSnapshot
 
 logger = setup_logger("analyzers")
 
 
+def _col(candles, name):
+    """Column as ndarray; zero-copy for CandleBuffer and most DataFrames"""
+    return np.asarray(candles[name])
+
+
+def _window_rows(strike_data, atm, num_strikes, strike_gap=STRIKE_GAP):
+    """Rows of a strike dict within ATM±num_strikes (all if not given or 0)"""
+    if atm is None or not num_strikes:
+        return strike_data.values()
+    min_strike, max_strike = atm - num_strikes * strike_gap, atm + num_strikes * strike_gap
+    return [d for s, d in strike_data.items() if min_strike <= s <= max_strike]
+
+
 # ==================== OI Analyzer ====================
 class OIAnalyzer:
     """Open Interest analysis"""
     
     @staticmethod
-    def calculate_total_oi(strike_data):
-        """Calculate total CE/PE OI"""
-        total_ce = sum(d.get('ce_oi', 0) for d in strike_data.values())
-        total_pe = sum(d.get('pe_oi', 0) for d in strike_data.values())
+    def calculate_total_oi(strike_data, atm=None, num_strikes=None, strike_gap=STRIKE_GAP):
+        """Calculate total CE/PE OI (optionally over ATM±num_strikes)
+        
+        `strike_gap` windows plain dicts; a ChainSnapshot carries its own.
+        """
+        if isinstance(strike_data, ChainSnapshot):
+            return (strike_data.total('ce_oi', atm, num_strikes),
+                    strike_data.total('pe_oi', atm, num_strikes))
+        
+        rows = _window_rows(strike_data, atm, num_strikes, strike_gap)
+        total_ce = sum(d.get('ce_oi', 0) for d in rows)
+        total_pe = sum(d.get('pe_oi', 0) for d in rows)
         return total_ce, total_pe
     
     @staticmethod
@@ -61,10 +84,15 @@ class VolumeAnalyzer:
     """Volume and order flow analysis"""
     
     @staticmethod
-    def calculate_total_volume(strike_data):
-        """Calculate total CE/PE volume"""
-        ce_vol = sum(d.get('ce_vol', 0) for d in strike_data.values())
-        pe_vol = sum(d.get('pe_vol', 0) for d in strike_data.values())
+    def calculate_total_volume(strike_data, atm=None, num_strikes=None, strike_gap=STRIKE_GAP):
+        """Calculate total CE/PE volume (optionally over ATM±num_strikes, see calculate_total_oi)"""
+        if isinstance(strike_data, ChainSnapshot):
+            return (strike_data.total('ce_vol', atm, num_strikes),
+                    strike_data.total('pe_vol', atm, num_strikes))
+        
+        rows = _window_rows(strike_data, atm, num_strikes, strike_gap)
+        ce_vol = sum(d.get('ce_vol', 0) for d in rows)
+        pe_vol = sum(d.get('pe_vol', 0) for d in rows)
         return ce_vol, pe_vol
     
     @staticmethod
@@ -76,9 +104,9 @@ class VolumeAnalyzer:
         return ratio >= VOL_SPIKE_MULTIPLIER, round(ratio, 2)
     
     @staticmethod
-    def calculate_order_flow(strike_data):
+    def calculate_order_flow(strike_data, atm=None, num_strikes=None, strike_gap=STRIKE_GAP):
         """Calculate order flow ratio (CE vol / PE vol)"""
-        ce_vol, pe_vol = VolumeAnalyzer.calculate_total_volume(strike_data)
+        ce_vol, pe_vol = VolumeAnalyzer.calculate_total_volume(strike_data, atm, num_strikes, strike_gap)
         
         if ce_vol == 0 and pe_vol == 0:
             return 1.0
@@ -96,9 +124,9 @@ class VolumeAnalyzer:
         if len(df) < periods + 1:
             return {'trend': 'unknown', 'avg': 0, 'current': 0, 'ratio': 1.0}
         
-        recent = df['volume'].tail(periods + 1)
-        avg = recent.iloc[:-1].mean()
-        current = recent.iloc[-1]
+        recent = _col(df, 'volume')[-(periods + 1):]
+        avg = recent[:-1].mean()
+        current = recent[-1]
         ratio = current / avg if avg > 0 else 1.0
         
         trend = 'increasing' if ratio > 1.3 else 'decreasing' if ratio < 0.7 else 'stable'
@@ -122,34 +150,44 @@ class TechnicalAnalyzer:
             return None
         
         try:
-            df_copy = df.copy()
-            df_copy['typical_price'] = (df_copy['high'] + df_copy['low'] + df_copy['close']) / 3
-            df_copy['vol_price'] = df_copy['typical_price'] * df_copy['volume']
-            df_copy['cum_vol_price'] = df_copy['vol_price'].cumsum()
-            df_copy['cum_volume'] = df_copy['volume'].cumsum()
-            df_copy['vwap'] = df_copy['cum_vol_price'] / df_copy['cum_volume']
-            return round(df_copy['vwap'].iloc[-1], 2)
+            typical_price = (_col(df, 'high') + _col(df, 'low') + _col(df, 'close')) / 3
+            cum_vol_price = np.cumsum(typical_price * _col(df, 'volume'))[-1]
+            cum_volume = np.cumsum(_col(df, 'volume'))[-1]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return round(np.float64(cum_vol_price) / cum_volume, 2)
         except Exception as e:
             logger.error(f"VWAP error: {e}")
             return None
     
     @staticmethod
-    def calculate_atr(df, period=ATR_PERIOD):
-        """Calculate ATR"""
+    def calculate_vwap_distance(price, vwap):
+        """Absolute distance of price from VWAP (points)"""
+        return round(abs(price - vwap), 2)
+    
+    @staticmethod
+    def calculate_atr(df, period=ATR_PERIOD, fallback=ATR_FALLBACK):
+        """Calculate ATR (`fallback` until there are `period` bars or on error)"""
         if df is None or len(df) < period:
-            return ATR_FALLBACK
+            return fallback
         
         try:
-            df_copy = df.copy()
-            df_copy['h_l'] = df_copy['high'] - df_copy['low']
-            df_copy['h_cp'] = abs(df_copy['high'] - df_copy['close'].shift(1))
-            df_copy['l_cp'] = abs(df_copy['low'] - df_copy['close'].shift(1))
-            df_copy['tr'] = df_copy[['h_l', 'h_cp', 'l_cp']].max(axis=1)
-            atr = df_copy['tr'].rolling(window=period).mean().iloc[-1]
-            return round(atr, 2)
+            # Only the last `period` true ranges (plus one prior close) matter
+            high = _col(df, 'high')[-period:]
+            low = _col(df, 'low')[-period:]
+            prev_close = _col(df, 'close')[-(period + 1):-1]
+            
+            # The session's first bar has no prior close: TR = high - low
+            tr = (high - low).astype(np.float64)
+            offset = len(tr) - len(prev_close)
+            tr[offset:] = np.maximum.reduce([
+                tr[offset:],
+                np.abs(high[offset:] - prev_close),
+                np.abs(low[offset:] - prev_close)
+            ])
+            return round(tr.mean(), 2)
         except Exception as e:
             logger.error(f"ATR error: {e}")
-            return ATR_FALLBACK
+            return fallback
     
     @staticmethod
     def analyze_candle(df):
@@ -158,8 +196,7 @@ class TechnicalAnalyzer:
             return TechnicalAnalyzer._empty_candle()
         
         try:
-            candle = df.iloc[-1]
-            o, h, l, c = candle['open'], candle['high'], candle['low'], candle['close']
+            o, h, l, c = (_col(df, name)[-1] for name in ('open', 'high', 'low', 'close'))
             
             total_size = h - l
             body = abs(c - o)
@@ -201,9 +238,10 @@ class TechnicalAnalyzer:
         if df is None or len(df) < periods:
             return {'direction': 'unknown', 'strength': 0, 'green': 0, 'red': 0}
         
-        recent = df.tail(periods)
-        green = sum(recent['close'] > recent['open'])
-        red = sum(recent['close'] < recent['open'])
+        close = _col(df, 'close')[-periods:]
+        open_ = _col(df, 'open')[-periods:]
+        green = int(np.count_nonzero(close > open_))
+        red = int(np.count_nonzero(close < open_))
         
         direction = 'bullish' if green >= 2 else 'bearish' if red >= 2 else 'sideways'
         strength = green if green >= 2 else red if red >= 2 else 0
@@ -224,45 +262,172 @@ class TechnicalAnalyzer:
         }
 
 
+# ==================== Streaming Indicators ====================
+class IndicatorEngine:
+    """Stateful VWAP/ATR updated per bar instead of per session
+    
+    Closed bars are folded into running sums once; the last (forming) bar
+    is re-applied on every update so revisions are picked up. Results
+    match TechnicalAnalyzer.calculate_vwap / calculate_atr.
+    """
+    
+    def __init__(self, period=ATR_PERIOD, smoothing=ATR_SMOOTHING, fallback=ATR_FALLBACK):
+        self.period = period
+        self.smoothing = smoothing
+        self.fallback = fallback
+        self.reset()
+    
+    def reset(self):
+        self.count = 0
+        self.first_ts = None
+        # VWAP: sums over closed bars
+        self.cum_vol_price = 0.0
+        self.cum_volume = 0.0
+        # ATR: closed-bar TRs (SMA window) or Wilder state
+        self.closed_trs = deque(maxlen=self.period - 1)
+        self.wilder_atr = None
+        self.wilder_seed = []
+        self.prev_close = None
+        # Forming bar
+        self.forming = None
+        self.forming_prev_close = None
+    
+    def update(self, df):
+        """Feed bars added or revised since the last call"""
+        if df is None or len(df) == 0:
+            return
+        
+        n = len(df)
+        first_ts = _col(df, 'timestamp')[0] if 'timestamp' in df.columns else None
+        if n < self.count or first_ts != self.first_ts:
+            self.reset()
+            self.first_ts = first_ts
+        
+        highs, lows, closes, volumes = (_col(df, name) for name in ('high', 'low', 'close', 'volume'))
+        for i in range(max(self.count - 1, 0), n):
+            self.on_bar(i, highs[i], lows[i], closes[i], volumes[i])
+    
+    def on_bar(self, index, high, low, close, volume):
+        """Apply bar `index`; a new index closes the previous forming bar"""
+        if index == self.count:
+            if self.forming is not None:
+                self._close_forming()
+            self.count += 1
+            self.forming_prev_close = self.prev_close
+        elif index != self.count - 1:
+            raise ValueError(f"bar {index} out of order (have {self.count})")
+        
+        self.forming = (high, low, close, volume)
+    
+    def _close_forming(self):
+        high, low, close, volume = self.forming
+        self.cum_vol_price += (high + low + close) / 3 * volume
+        self.cum_volume += volume
+        
+        tr = self._true_range(high, low, self.forming_prev_close)
+        if self.smoothing == 'wilder':
+            self.wilder_atr, self.wilder_seed = self._wilder_step(self.wilder_atr, self.wilder_seed, tr)
+        else:
+            self.closed_trs.append(tr)
+        self.prev_close = close
+    
+    @staticmethod
+    def _true_range(high, low, prev_close):
+        if prev_close is None:
+            return high - low
+        return max(high - low, abs(high - prev_close), abs(low - prev_close))
+    
+    def _wilder_step(self, atr, seed, tr):
+        if atr is not None:
+            return (atr * (self.period - 1) + tr) / self.period, seed
+        seed = seed + [tr]
+        if len(seed) == self.period:
+            return sum(seed) / self.period, []
+        return None, seed
+    
+    @property
+    def vwap(self):
+        """Session VWAP including the forming bar"""
+        if self.forming is None:
+            return None
+        high, low, close, volume = self.forming
+        cum_volume = self.cum_volume + volume
+        if cum_volume == 0:
+            return float('nan')
+        return round((self.cum_vol_price + (high + low + close) / 3 * volume) / cum_volume, 2)
+    
+    @property
+    def atr(self):
+        """ATR over the last `period` bars including the forming bar"""
+        if self.count < self.period:
+            return self.fallback
+        
+        high, low, _, _ = self.forming
+        tr = self._true_range(high, low, self.forming_prev_close)
+        
+        if self.smoothing == 'wilder':
+            atr, _ = self._wilder_step(self.wilder_atr, self.wilder_seed, tr)
+            return round(atr, 2)
+        
+        return round((sum(self.closed_trs) + tr) / self.period, 2)
+
+
 # ==================== Market Analyzer ====================
 class MarketAnalyzer:
     """Market structure analysis"""
     
     @staticmethod
-    def calculate_max_pain(strike_data, spot_price):
-        """Calculate max pain strike"""
-        if not strike_data:
-            return 0, 0.0
+    def calculate_pain_curve(strike_data):
+        """Writer payout at every strike -> (strikes, pain) arrays, O(n)
         
-        strikes = sorted(strike_data.keys())
-        max_pain_strike = strikes[len(strikes) // 2]
-        min_pain = float('inf')
+        pain[j] = sum_{i<j} ce[i]*(K[j]-K[i]) + sum_{i>j} pe[i]*(K[i]-K[j]),
+        which splits into K[j]*prefix(ce) - prefix(ce*K) plus the mirrored
+        suffix terms for puts.
         
-        for test_strike in strikes:
-            total_pain = 0.0
-            
-            for strike, data in strike_data.items():
-                ce_oi = data.get('ce_oi', 0)
-                pe_oi = data.get('pe_oi', 0)
-                
-                if test_strike > strike:
-                    total_pain += ce_oi * (test_strike - strike)
-                if test_strike < strike:
-                    total_pain += pe_oi * (strike - test_strike)
-            
-            if total_pain < min_pain:
-                min_pain = total_pain
-                max_pain_strike = test_strike
+        Only the strikes passed in count: with the cycle's chain (ATM ±
+        CHAIN_STRIKE_WINDOW) this is a windowed approximation, exact only
+        when CHAIN_STRIKE_WINDOW=0 fetches the full chain.
+        """
+        if isinstance(strike_data, ChainSnapshot):
+            strikes = strike_data.strikes.astype(np.float64)
+            ce = strike_data.columns['ce_oi']
+            pe = strike_data.columns['pe_oi']
+        else:
+            keys = sorted(strike_data)
+            strikes = np.array(keys, dtype=np.float64)
+            ce = np.array([strike_data[s].get('ce_oi', 0) for s in keys], dtype=np.float64)
+            pe = np.array([strike_data[s].get('pe_oi', 0) for s in keys], dtype=np.float64)
+        
+        # Exclusive prefix (strikes below) and suffix (strikes above) sums
+        ce_below = np.cumsum(ce) - ce
+        ce_k_below = np.cumsum(ce * strikes) - ce * strikes
+        pe_above = np.cumsum(pe[::-1])[::-1] - pe
+        pe_k_above = np.cumsum((pe * strikes)[::-1])[::-1] - pe * strikes
+        
+        pain = (strikes * ce_below - ce_k_below) + (pe_k_above - strikes * pe_above)
+        return strikes, pain
+    
+    @staticmethod
+    def calculate_max_pain(strike_data, spot_price=None):
+        """Calculate max pain strike -> (strike, pain); lowest strike wins ties
+        
+        Windowed approximation unless strike_data is the full chain (see
+        calculate_pain_curve); far OTM OI outside the window is ignored.
+        """
+        if not strike_data:
+            return 0, 0.0
         
-        return max_pain_strike, round(min_pain, 2)
+        strikes, pain = MarketAnalyzer.calculate_pain_curve(strike_data)
+        i = int(np.argmin(pain))
+        return int(strikes[i]), round(float(pain[i]), 2)
     
     @staticmethod
-    def detect_gamma_zone():
-        """Check if expiry day"""
+    def detect_gamma_zone(expiry=None):
+        """Check if expiry day ('YYYY-MM-DD'; defaults to NIFTY weekly)"""
         try:
             from config import get_next_tuesday_expiry
-            today = datetime.now(IST).date()
-            expiry = datetime.strptime(get_next_tuesday_expiry(), '%Y-%m-%d').date()
+            today = get_ist_time().date()
+            expiry = datetime.strptime(expiry or get_next_tuesday_expiry(), '%Y-%m-%d').date()
             return today == expiry
         except:
             return False
@@ -0,0 +1,101 @@
+"""
+Option chain parse benchmark: legacy two-branch parser vs chain_parser
+
+Times decode + strike-window parse of one chain response body. Pass a
+recorded response (the raw JSON body of /v2/option/chain) to use real
+data; otherwise a response of the same shape is synthesized.
+
+Usage: python benchmarks/bench_chain_parser.py [recorded.json] [--strikes 200] [--window 2]
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import chain_parser
+from config import STRIKE_GAP
+from datagen import synthetic_chain
+
+
+def legacy_parse(body, min_strike, max_strike):
+    """Parser as it was before chain_parser (stdlib json, repeated .get)"""
+    data = json.loads(body)['data']
+    strike_data = {}
+
+    if isinstance(data, list):
+        for item in data:
+            strike = item.get('strike_price')
+            if not strike or strike < min_strike or strike > max_strike:
+                continue
+            strike_data[strike] = {
+                'ce_oi': item.get('call_options', {}).get('open_interest', 0),
+                'pe_oi': item.get('put_options', {}).get('open_interest', 0),
+                'ce_vol': item.get('call_options', {}).get('volume', 0),
+                'pe_vol': item.get('put_options', {}).get('volume', 0),
+                'ce_ltp': item.get('call_options', {}).get('last_price', 0),
+                'pe_ltp': item.get('put_options', {}).get('last_price', 0)
+            }
+    elif isinstance(data, dict):
+        for key, item in data.items():
+            strike = item.get('strike_price')
+            if not strike or strike < min_strike or strike > max_strike:
+                continue
+            strike_data[strike] = {
+                'ce_oi': item.get('call_options', {}).get('open_interest', 0),
+                'pe_oi': item.get('put_options', {}).get('open_interest', 0),
+                'ce_vol': item.get('call_options', {}).get('volume', 0),
+                'pe_vol': item.get('put_options', {}).get('volume', 0),
+                'ce_ltp': item.get('call_options', {}).get('last_price', 0),
+                'pe_ltp': item.get('put_options', {}).get('last_price', 0)
+            }
+    return strike_data
+
+
+def fast_parse(body, min_strike, max_strike):
+    return chain_parser.parse_option_chain(chain_parser.loads(body)['data'], min_strike, max_strike)
+
+
+def bench(fn, body, min_strike, max_strike, number):
+    runs = timeit.repeat(lambda: fn(body, min_strike, max_strike), number=number, repeat=5)
+    return min(runs) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('recorded', nargs='?', help='recorded option chain response body')
+    parser.add_argument('--strikes', type=int, default=200)
+    parser.add_argument('--window', type=int, default=2, help='strikes each side of ATM')
+    parser.add_argument('--number', type=int, default=200)
+    args = parser.parse_args()
+
+    if args.recorded:
+        with open(args.recorded, 'rb') as f:
+            body = f.read()
+        data = json.loads(body)['data']
+        items = data.values() if isinstance(data, dict) else data
+        strikes = sorted(item['strike_price'] for item in items)
+        atm = strikes[len(strikes) // 2]
+        source = args.recorded
+    else:
+        body = synthetic_chain(args.strikes)
+        atm = 24000
+        source = f"synthetic, {args.strikes} strikes"
+
+    min_strike = atm - args.window * STRIKE_GAP
+    max_strike = atm + args.window * STRIKE_GAP
+
+    legacy = bench(legacy_parse, body, min_strike, max_strike, args.number)
+    fast = bench(fast_parse, body, min_strike, max_strike, args.number)
+
+    print(f"chain: {source}, {len(body) / 1024:.0f} KiB, window ATM±{args.window}")
+    print(f"orjson: {'yes' if chain_parser.ORJSON_AVAILABLE else 'no (stdlib json)'}")
+    print(f"legacy parser : {legacy:9.1f} µs/parse")
+    print(f"chain_parser  : {fast:9.1f} µs/parse  ({legacy / fast:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
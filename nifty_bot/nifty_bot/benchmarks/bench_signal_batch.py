@@ -0,0 +1,176 @@
+"""
+Batch signal benchmark: SignalGenerator.generate_batch vs per-bar generate()
+
+Draws random bars around the signal thresholds and, for every profile,
+times the scalar path (generate() + validate() bar by bar on a simulated
+clock) against generate_batch() + validate_batch(). Both paths must agree
+bar for bar: every Signal field and every accept/reject decision. Any
+mismatch is printed and the script exits non-zero, so a threshold change
+that only lands in one path shows up here.
+
+Usage: python benchmarks/bench_signal_batch.py [--bars 3000] [--seed 1] [--index NIFTY]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from dataclasses import fields
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from config import OI_THRESHOLD_MEDIUM, ATM_OI_THRESHOLD, OI_5M_THRESHOLD
+from clock import SimulatedClock, set_clock
+from datagen import SESSION_OPEN
+from instruments import PROFILES
+from signal_engine import SignalGenerator, SignalValidator
+
+BAR_SECONDS = 60
+
+
+# ==================== Bars ====================
+def random_bars(n, profile, seed=1):
+    """Batch columns for n bars, drawn so that signals fire on a good share"""
+    rng = np.random.default_rng(seed)
+    scale = profile.point_scale
+    futures = 24000 * scale + rng.normal(0, 40 * scale, n).cumsum()
+    vwap = futures + rng.normal(0, 6 * scale, n)
+
+    def oi_change(threshold):
+        return rng.uniform(-3 * threshold, 3 * threshold, n)
+
+    ce_ltp = rng.uniform(50, 250, n)
+    pe_ltp = rng.uniform(50, 250, n)
+    ce_ltp[rng.random(n) < 0.1] = np.nan  # missing premium -> 150 default
+    pe_ltp[rng.random(n) < 0.1] = np.nan
+
+    flag = lambda p: rng.random(n) < p
+    return {
+        'spot_price': futures - rng.uniform(0, 20 * scale, n),
+        'futures_price': futures,
+        'vwap': vwap,
+        'vwap_distance': np.round(np.abs(futures - vwap), 2),
+        'pcr': rng.uniform(0.5, 1.6, n),
+        'atr': rng.uniform(5 * scale, 45 * scale, n),
+        'atm_strike': (np.round(futures / profile.strike_gap) * profile.strike_gap).astype(np.int64),
+        'ce_total_5m': oi_change(OI_5M_THRESHOLD), 'pe_total_5m': oi_change(OI_5M_THRESHOLD),
+        'ce_total_15m': oi_change(OI_THRESHOLD_MEDIUM), 'pe_total_15m': oi_change(OI_THRESHOLD_MEDIUM),
+        'atm_ce_5m': oi_change(ATM_OI_THRESHOLD), 'atm_pe_5m': oi_change(ATM_OI_THRESHOLD),
+        'atm_ce_15m': oi_change(ATM_OI_THRESHOLD), 'atm_pe_15m': oi_change(ATM_OI_THRESHOLD),
+        'has_5m_total': flag(0.9), 'has_15m_total': flag(0.9),
+        'has_5m_atm': flag(0.9), 'has_15m_atm': flag(0.9),
+        'volume_spike': flag(0.5),
+        'volume_ratio': rng.uniform(0.5, 3.0, n),
+        'order_flow': rng.uniform(0.3, 2.5, n),
+        'candle_color': rng.integers(-1, 2, n),
+        'candle_size': rng.uniform(0, 12 * scale, n),
+        'consecutive_green': rng.integers(0, 4, n),
+        'consecutive_red': rng.integers(0, 4, n),
+        'gamma_zone': flag(0.2),
+        'multi_tf': flag(0.3),
+        'ce_ltp': ce_ltp,
+        'pe_ltp': pe_ltp,
+    }
+
+
+def scalar_kwargs(c, i):
+    """generate() kwargs for bar i (the dict arguments rebuilt from the flat columns)"""
+    flat = ('candle_color', 'candle_size', 'consecutive_green', 'consecutive_red', 'ce_ltp', 'pe_ltp')
+    kwargs = {name: values[i].item() for name, values in c.items() if name not in flat}
+    color = int(c['candle_color'][i])
+    atm_data = {side: float(c[side][i]) for side in ('ce_ltp', 'pe_ltp') if not np.isnan(c[side][i])}
+    kwargs.update(
+        atm_data=atm_data,
+        candle_data={'color': 'GREEN' if color == 1 else 'RED' if color == -1 else 'DOJI',
+                     'size': float(c['candle_size'][i])},
+        momentum={'consecutive_green': int(c['consecutive_green'][i]),
+                  'consecutive_red': int(c['consecutive_red'][i])}
+    )
+    return kwargs
+
+
+# ==================== Paths ====================
+def run_scalar(c, profile, clock, start):
+    """generate() + validate() bar by bar -> (signals, accepted mask)"""
+    generator, validator = SignalGenerator(profile), SignalValidator()
+    n = len(c['futures_price'])
+    signals, accepted = [], np.zeros(n, dtype=bool)
+    for i in range(n):
+        clock.set(start + timedelta(seconds=i * BAR_SECONDS))
+        signal = generator.generate(**scalar_kwargs(c, i))
+        signals.append(signal)
+        accepted[i] = validator.validate(signal) is not None
+    return signals, accepted
+
+
+def run_batch(c, profile, timestamps):
+    batch = SignalGenerator.generate_batch(c, profile)
+    accepted = SignalValidator().validate_batch(batch, timestamps)
+    return batch, accepted
+
+
+def diff_signal(scalar, batched):
+    """Names of Signal fields that differ (timestamp excluded)"""
+    if scalar is None or batched is None:
+        return [] if scalar is batched else ['signal']
+    return [f.name for f in fields(scalar)
+            if f.name != 'timestamp' and getattr(scalar, f.name) != getattr(batched, f.name)]
+
+
+def check_profile(profile, bars, seed):
+    """Time both paths for one profile; returns the number of mismatches"""
+    c = random_bars(bars, profile, seed)
+    clock = SimulatedClock(SESSION_OPEN)
+    set_clock(clock)
+    start = clock.now()
+    timestamps = np.array([(start + timedelta(seconds=i * BAR_SECONDS)).timestamp() for i in range(bars)])
+
+    t0 = time.perf_counter()
+    signals, scalar_accepted = run_scalar(c, profile, clock, start)
+    t1 = time.perf_counter()
+    batch, batch_accepted = run_batch(c, profile, timestamps)
+    t2 = time.perf_counter()
+
+    mismatches = 0
+    for i, signal in enumerate(signals):
+        batched = batch.signal(i, signal.timestamp if signal else None)
+        differing = diff_signal(signal, batched)
+        if differing:
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"  bar {i}: generate vs generate_batch differ in {', '.join(differing)}")
+    rejected = np.flatnonzero(scalar_accepted != batch_accepted)
+    for i in rejected[:5]:
+        print(f"  bar {i}: validate={scalar_accepted[i]} validate_batch={batch_accepted[i]}")
+    mismatches += len(rejected)
+
+    fired = sum(s is not None for s in signals)
+    print(f"{profile.name:<10} {bars} bars, {fired} signals, {int(scalar_accepted.sum())} accepted | "
+          f"scalar {(t1 - t0) / bars * 1e6:8.1f} µs/bar  batch {(t2 - t1) / bars * 1e6:6.2f} µs/bar "
+          f"({(t1 - t0) / max(t2 - t1, 1e-9):.0f}x) | {'OK' if not mismatches else f'{mismatches} MISMATCHES'}")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--bars', type=int, default=3000)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--index', action='append', help='profile to check (repeatable; default all)')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)  # validate() logs every cooldown/R:R rejection
+    names = [name.upper() for name in args.index] if args.index else list(PROFILES)
+    try:
+        failures = sum(check_profile(PROFILES[name], args.bars, args.seed) for name in names)
+    finally:
+        set_clock(None)
+    if failures:
+        sys.exit(f"\n{failures} batch/scalar mismatches")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Compare two benchmark result files from benchmarks/run.py
+
+Prints the median per-call time of every case in both runs and the
+ratio new/base. Cases slower by more than --threshold are flagged and
+make the exit status 1, so it can gate CI.
+
+Usage: python benchmarks/compare.py BASE.json NEW.json [--threshold 0.10]
+"""
+
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('base')
+    parser.add_argument('new')
+    parser.add_argument('--threshold', type=float, default=0.10, help='allowed slowdown (0.10 = 10%%)')
+    args = parser.parse_args()
+
+    base, new = load(args.base), load(args.new)
+    print(f"base: {base['meta']['commit']} ({base['meta']['timestamp']})")
+    print(f"new:  {new['meta']['commit']} ({new['meta']['timestamp']})\n")
+    print(f"{'case':<48} {'base µs':>12} {'new µs':>12} {'ratio':>7}")
+
+    regressions = 0
+    for name in sorted(set(base['results']) | set(new['results'])):
+        old, cur = base['results'].get(name), new['results'].get(name)
+        if old is None or cur is None:
+            side = 'new only' if old is None else 'base only'
+            print(f"{name:<48} {'':>12} {'':>12} {side:>7}")
+            continue
+        ratio = cur['median_us'] / old['median_us'] if old['median_us'] else float('inf')
+        flag = ''
+        if ratio > 1 + args.threshold:
+            flag = '  ⚠️ slower'
+            regressions += 1
+        elif ratio < 1 / (1 + args.threshold):
+            flag = '  ✅ faster'
+        print(f"{name:<48} {old['median_us']:12.2f} {cur['median_us']:12.2f} {ratio:6.2f}x{flag}")
+
+    if regressions:
+        print(f"\n{regressions} case(s) slower by more than {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
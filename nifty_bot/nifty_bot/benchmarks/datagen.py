@@ -0,0 +1,101 @@
+"""
+Synthetic market data for benchmarks
+
+Seeded generators shaped like Upstox responses: a session of 1-minute
+futures candles (random walk with a U-shaped intraday volume profile)
+and option chains whose OI peaks around the ATM strike.
+"""
+
+import json
+import math
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import chain_parser
+from candle_store import CandleStore
+from config import STRIKE_GAP, SESSION_MINUTES
+
+SESSION_OPEN = datetime(2025, 1, 6, 9, 15)
+
+
+# ==================== Candles ====================
+def session_candles(minutes=SESSION_MINUTES, start_price=24000.0, seed=1):
+    """Upstox intraday candle rows, newest first:
+    [ts, open, high, low, close, volume, oi]
+    """
+    rng = random.Random(seed)
+    rows = []
+    price = start_price
+    oi = 12_000_000
+    for i in range(minutes):
+        ts = SESSION_OPEN + timedelta(minutes=i)
+        open_ = price
+        close = open_ + rng.gauss(0, 6)
+        high = max(open_, close) + abs(rng.gauss(0, 3))
+        low = min(open_, close) - abs(rng.gauss(0, 3))
+        # Heavier volume at the open and close
+        shape = 1.0 + 1.5 * (math.exp(-i / 30) + math.exp(-(minutes - i) / 30))
+        volume = int(rng.uniform(0.6, 1.4) * 40_000 * shape)
+        oi += rng.randint(-20_000, 25_000)
+        rows.append([f"{ts:%Y-%m-%dT%H:%M:%S}+05:30", round(open_, 2), round(high, 2),
+                     round(low, 2), round(close, 2), volume, oi])
+        price = close
+    rows.reverse()
+    return rows
+
+
+def candle_buffer(minutes=SESSION_MINUTES, seed=1):
+    """Session candles as the CandleBuffer the analyzers receive"""
+    store = CandleStore()
+    store.merge('bench', session_candles(minutes, seed=seed))
+    return store.get('bench')
+
+
+# ==================== Option Chains ====================
+def synthetic_chain(num_strikes=200, atm=24000, seed=None):
+    """Upstox-shaped /v2/option/chain body with num_strikes strikes around atm
+
+    Without a seed OI/volume follow a fixed ramp; with one they are drawn
+    around a peak at the ATM strike.
+    """
+    rng = random.Random(seed) if seed is not None else None
+    first = atm - (num_strikes // 2) * STRIKE_GAP
+    data = []
+    for i in range(num_strikes):
+        strike = first + i * STRIKE_GAP
+        if rng:
+            peak = math.exp(-((strike - atm) / (8 * STRIKE_GAP)) ** 2)
+            ce_oi = int(rng.uniform(0.5, 1.5) * (50_000 + 900_000 * peak * (1.2 if strike > atm else 0.8)))
+            pe_oi = int(rng.uniform(0.5, 1.5) * (50_000 + 900_000 * peak * (1.2 if strike < atm else 0.8)))
+            volume = int(rng.uniform(0.5, 1.5) * (2_000 + 60_000 * peak))
+        else:
+            ce_oi, pe_oi, volume = 500000 + i * 100, 450000 + i * 90, 12000 + i
+
+        def side(kind, oi, intrinsic):
+            ltp = round(max(intrinsic, 0) + 80 * math.exp(-abs(strike - atm) / 400) + 0.05, 2)
+            return {
+                'instrument_key': f"NSE_FO|{kind}{strike}",
+                'market_data': {'ltp': ltp, 'volume': volume, 'oi': oi, 'close_price': ltp - 1,
+                                'bid_price': ltp - 0.5, 'bid_qty': 75, 'ask_price': ltp + 0.5,
+                                'ask_qty': 150, 'prev_oi': oi - 500},
+                'option_greeks': {'vega': 12.1, 'theta': -8.4, 'gamma': 0.001, 'delta': 0.5,
+                                  'iv': 14.2, 'pop': 48.0}
+            }
+
+        data.append({
+            'expiry': '2025-01-07', 'pcr': 0.9, 'strike_price': float(strike),
+            'underlying_key': 'NSE_INDEX|Nifty 50', 'underlying_spot_price': float(atm),
+            'call_options': side('CE', ce_oi, atm - strike),
+            'put_options': side('PE', pe_oi, strike - atm)
+        })
+    return json.dumps({'status': 'success', 'data': data}).encode()
+
+
+def strike_data(num_strikes=50, atm=24000, seed=1):
+    """Parsed ChainSnapshot with every strike of a synthetic chain"""
+    data = chain_parser.loads(synthetic_chain(num_strikes, atm, seed))['data']
+    return chain_parser.parse_option_chain(data, float('-inf'), float('inf'))
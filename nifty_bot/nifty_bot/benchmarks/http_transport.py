@@ -0,0 +1,117 @@
+"""
+HTTP transport against a fake Upstox server with injected latency
+
+Starts a local aiohttp server whose responses take `--latency` seconds,
+with a `--tail` fraction delayed by `--slow` seconds instead. The first
+request on each new connection pays `--handshake` extra (standing in for
+TCP + TLS setup to the real API). Bursts of concurrent requests (one
+burst ~ one cycle) are fired through:
+
+  baseline  plain aiohttp.ClientSession(), no pre-warm, no hedging
+  tuned     transport.create_session() + pre-warm
+  hedged    tuned + hedged duplicates past the rolling p95
+
+Reports first-burst latency, p50/p95/p99/max per request and how many
+TCP connections the server saw.
+
+Usage: python benchmarks/http_transport.py [--bursts 30] [--concurrency 6] [--latency 0.02] [--tail 0.02] [--slow 1.0] [--handshake 0.15]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiohttp
+from aiohttp import web
+
+from data_manager import UpstoxClient
+from ratelimit import RateLimiter
+from transport import prewarm
+
+
+# ==================== Fake Server ====================
+async def start_server(args, seed=7):
+    """Fake API; returns (runner, base_url, set of peer addresses seen)"""
+    rng = random.Random(seed)
+    peers = set()
+    body = json.dumps({'status': 'success', 'data': {'x': {'last_price': 25000.0}}}).encode()
+
+    async def handle(request):
+        peer = request.transport.get_extra_info('peername')
+        delay = 0.0 if peer in peers else args.handshake
+        peers.add(peer)
+        if request.method == 'GET':
+            delay += args.slow if rng.random() < args.tail else args.latency
+        await asyncio.sleep(delay)
+        return web.Response(body=body, content_type='application/json')
+
+    app = web.Application()
+    app.router.add_route('*', '/{tail:.*}', handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}", peers
+
+
+# ==================== Scenarios ====================
+async def run_client(mode, base_url, args):
+    limiter = RateLimiter({'default': (10000, 1000000)})
+    async with UpstoxClient(limiter=limiter, hedge=(mode == 'hedged')) as client:
+        if mode == 'baseline':
+            await client.session.close()
+            client.session = aiohttp.ClientSession()
+        else:
+            await prewarm(client.session, base_url, args.concurrency)
+
+        latencies, bursts = [], []
+        for _ in range(args.bursts):
+            async def timed():
+                start = time.perf_counter()
+                await client._request(f"{base_url}/v3/quote")
+                return time.perf_counter() - start
+
+            start = time.perf_counter()
+            latencies.extend(await asyncio.gather(*(timed() for _ in range(args.concurrency))))
+            bursts.append(time.perf_counter() - start)
+            await asyncio.sleep(args.gap)
+    return latencies, bursts
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--bursts', type=int, default=30)
+    parser.add_argument('--concurrency', type=int, default=6)
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--tail', type=float, default=0.02, help='fraction of slow responses')
+    parser.add_argument('--slow', type=float, default=1.0)
+    parser.add_argument('--handshake', type=float, default=0.15, help='extra delay on a new connection')
+    parser.add_argument('--gap', type=float, default=0.05, help='idle seconds between bursts')
+    args = parser.parse_args()
+
+    print(f"{'mode':<10} {'first':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'burst p95':>10} {'conns':>6}")
+    for mode in ('baseline', 'tuned', 'hedged'):
+        runner, base_url, peers = await start_server(args)
+        try:
+            latencies, bursts = await run_client(mode, base_url, args)
+        finally:
+            await runner.cleanup()
+        ms = lambda v: f"{v * 1000:7.1f}ms"
+        print(f"{mode:<10} {ms(bursts[0]):>8} {ms(percentile(latencies, 50)):>8} {ms(percentile(latencies, 95)):>8} "
+              f"{ms(percentile(latencies, 99)):>8} {ms(max(latencies)):>8} {ms(percentile(bursts, 95)):>10} {len(peers):>6}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,143 @@
+"""
+Event-loop responsiveness under slow Redis
+
+Puts a latency-injecting TCP proxy in front of a local Redis and runs
+RedisBrain snapshot saves/lookups while a heartbeat coroutine measures
+how late the loop wakes it up. For comparison the same workload is run
+through a blocking (sync) redis client.
+
+Usage: python benchmarks/redis_loop_latency.py [--redis redis://localhost:6379/0] [--delay 0.2]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import redis as sync_redis
+
+import data_manager
+from data_manager import RedisBrain
+
+
+# ==================== Latency Proxy ====================
+def start_proxy(upstream_host, upstream_port, delay):
+    """Run the proxy on its own thread/loop so a blocking client can't stall it"""
+    ready = threading.Event()
+    result = {}
+
+    def serve():
+        loop = asyncio.new_event_loop()
+        server = loop.run_until_complete(_proxy(upstream_host, upstream_port, delay))
+        result['port'] = server.sockets[0].getsockname()[1]
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=serve, daemon=True).start()
+    ready.wait()
+    return result['port']
+
+
+async def _proxy(upstream_host, upstream_port, delay):
+    """TCP proxy that delays every client->server chunk by `delay` seconds"""
+
+    async def pipe(reader, writer, lag):
+        try:
+            while data := await reader.read(65536):
+                if lag:
+                    await asyncio.sleep(lag)
+                writer.write(data)
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def handle(client_reader, client_writer):
+        server_reader, server_writer = await asyncio.open_connection(upstream_host, upstream_port)
+        asyncio.create_task(pipe(client_reader, server_writer, delay))
+        asyncio.create_task(pipe(server_reader, client_writer, 0))
+
+    return await asyncio.start_server(handle, '127.0.0.1', 0)
+
+
+# ==================== Workloads ====================
+async def heartbeat(stop, interval=0.01):
+    """Return max observed wake-up lag in seconds"""
+    worst = 0.0
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        worst = max(worst, loop.time() - start - interval)
+    return worst
+
+
+def sample_strikes(n=11):
+    return {24000 + 50 * i: {'ce_oi': 1000 + i, 'pe_oi': 900 + i, 'ce_vol': 10, 'pe_vol': 12}
+            for i in range(-(n // 2), n // 2 + 1)}
+
+
+async def run_async(url, cycles):
+    data_manager.REDIS_URL = url
+    brain = RedisBrain()
+    await brain.connect()
+    strikes = sample_strikes()
+
+    stop = asyncio.Event()
+    hb = asyncio.create_task(heartbeat(stop))
+    start = time.perf_counter()
+    for _ in range(cycles):
+        await brain.save_snapshot(10000, 9000, strikes)
+        await brain.get_total_oi_change(10000, 9000, 5)
+        await brain.get_strike_oi_change(24000, strikes[24000], 15)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    lag = await hb
+    await brain.close()
+    return elapsed, lag
+
+
+async def run_sync(url, cycles):
+    client = sync_redis.from_url(url, decode_responses=True)
+    stop = asyncio.Event()
+    hb = asyncio.create_task(heartbeat(stop))
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    for _ in range(cycles):
+        client.setex('bench:total', 60, '{}')
+        client.get('bench:total')
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    lag = await hb
+    client.close()
+    return elapsed, lag
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--redis', default=os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+    parser.add_argument('--delay', type=float, default=0.2, help='injected latency per request (s)')
+    parser.add_argument('--cycles', type=int, default=5)
+    args = parser.parse_args()
+
+    upstream = urlparse(args.redis)
+    port = start_proxy(upstream.hostname, upstream.port or 6379, args.delay)
+    url = f"redis://127.0.0.1:{port}{upstream.path or '/0'}"
+
+    sync_elapsed, sync_lag = await run_sync(url, args.cycles)
+    async_elapsed, async_lag = await run_async(url, args.cycles)
+
+    print(f"injected latency : {args.delay * 1000:.0f} ms/request, {args.cycles} cycles")
+    print(f"sync client      : {sync_elapsed:6.2f}s total, max loop lag {sync_lag * 1000:7.1f} ms")
+    print(f"RedisBrain async : {async_elapsed:6.2f}s total, max loop lag {async_lag * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
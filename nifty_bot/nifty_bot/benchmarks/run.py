@@ -0,0 +1,210 @@
+"""
+Microbenchmark suite: analyzers, option chain parsing and RedisBrain
+
+Every case runs in repeated batches sized to --batch-time; the per-call
+minimum and median go to a JSON file (default benchmarks/results/<commit>.json)
+that benchmarks/compare.py diffs against another run. RedisBrain runs in
+RAM mode and, given --redis (a scratch DB; keys use a bench namespace and
+are deleted afterwards), against a local Redis.
+
+Usage: python benchmarks/run.py [--filter max_pain] [--quick] [--redis redis://localhost:6379/15] [--output FILE]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import numpy as np
+
+import chain_parser
+import data_manager
+from analyzers import OIAnalyzer, VolumeAnalyzer, TechnicalAnalyzer, MarketAnalyzer, IndicatorEngine
+from clock import SimulatedClock, set_clock
+from data_manager import DataFetcher, RedisBrain
+from datagen import SESSION_OPEN, candle_buffer, synthetic_chain, strike_data
+
+CANDLE_SIZES = (60, 375)
+CHAIN_SIZES = (5, 50, 200)
+HISTORY_MINUTES = 30  # snapshots stored before timing RedisBrain lookups
+
+
+# ==================== Cases ====================
+class ChainClient:
+    """Stands in for UpstoxClient: decodes a fixed chain body per call"""
+
+    def __init__(self, body):
+        self.body = body
+
+    async def get_option_chain(self, instrument_key, expiry_date):
+        return chain_parser.loads(self.body)['data']
+
+
+def analyzer_cases():
+    """(name, fn, is_async) for the analyzers and chain parsing"""
+    cases = []
+    for n in CANDLE_SIZES:
+        df = candle_buffer(n)
+        engine = IndicatorEngine()
+        cases += [
+            (f"TechnicalAnalyzer.calculate_vwap[{n}]", lambda df=df: TechnicalAnalyzer.calculate_vwap(df), False),
+            (f"TechnicalAnalyzer.calculate_atr[{n}]", lambda df=df: TechnicalAnalyzer.calculate_atr(df), False),
+            (f"TechnicalAnalyzer.analyze_candle[{n}]", lambda df=df: TechnicalAnalyzer.analyze_candle(df), False),
+            (f"TechnicalAnalyzer.detect_momentum[{n}]", lambda df=df: TechnicalAnalyzer.detect_momentum(df), False),
+            (f"VolumeAnalyzer.analyze_volume_trend[{n}]", lambda df=df: VolumeAnalyzer.analyze_volume_trend(df), False),
+            (f"IndicatorEngine.update[{n}]", lambda df=df, e=engine: (e.reset(), e.update(df)), False),
+        ]
+
+    for n in CHAIN_SIZES:
+        snap = strike_data(n)
+        atm = int(snap.strikes[len(snap.strikes) // 2])
+        body = synthetic_chain(n, seed=1)
+        fetcher = DataFetcher(ChainClient(body))
+        cases += [
+            (f"OIAnalyzer.calculate_total_oi[{n}]", lambda s=snap, a=atm: OIAnalyzer.calculate_total_oi(s, a, 2), False),
+            (f"VolumeAnalyzer.calculate_total_volume[{n}]", lambda s=snap: VolumeAnalyzer.calculate_total_volume(s), False),
+            (f"VolumeAnalyzer.calculate_order_flow[{n}]", lambda s=snap, a=atm: VolumeAnalyzer.calculate_order_flow(s, a, 2), False),
+            (f"MarketAnalyzer.calculate_max_pain[{n}]", lambda s=snap: MarketAnalyzer.calculate_max_pain(s), False),
+            (f"DataFetcher.fetch_option_chain[{n}]", lambda f=fetcher: f.fetch_option_chain(24000.0), True),
+        ]
+    return cases
+
+
+async def redis_cases(mode, url):
+    """RedisBrain save/lookup cases; returns (cases, cleanup coroutine) or None if Redis is unreachable"""
+    data_manager.REDIS_URL = url
+    brain = RedisBrain(f"bench{os.getpid()}")
+    await brain.connect()
+    if url and brain.client is None:
+        return None
+
+    clock = SimulatedClock(SESSION_OPEN)
+    set_clock(clock)
+    snap = strike_data(41)
+    atm = int(snap.strikes[20])
+    atm_data = OIAnalyzer.get_atm_data(snap, atm)
+    ce, pe = OIAnalyzer.calculate_total_oi(snap, atm, 2)
+    for _ in range(HISTORY_MINUTES):
+        await brain.save_snapshot(ce, pe, snap)
+        clock.advance(60)
+
+    async def cleanup():
+        if brain.client is not None:
+            keys = await brain.client.keys(f"{brain.namespace}:*")
+            if keys:
+                await brain.client.delete(*keys)
+        await brain.close()
+        set_clock(None)
+
+    cases = [
+        (f"RedisBrain.save_snapshot[{mode}]", lambda: brain.save_snapshot(ce, pe, snap), True),
+        (f"RedisBrain.get_changes[{mode}]",
+         lambda: brain.get_changes(ce, pe, {atm: atm_data}, strikes=[atm], windows=(5, 15)), True),
+    ]
+    return cases, cleanup
+
+
+# ==================== Runner ====================
+async def measure(fn, is_async, batch_time, repeat):
+    """(min, median) seconds per call over `repeat` batches"""
+
+    async def batch(number):
+        start = time.perf_counter()
+        if is_async:
+            for _ in range(number):
+                await fn()
+        else:
+            for _ in range(number):
+                fn()
+        return time.perf_counter() - start
+
+    number = 1
+    while (elapsed := await batch(number)) < batch_time / 10 and number < 1_000_000:
+        number *= 10
+    number = max(1, int(number * batch_time / max(elapsed, 1e-9)))
+
+    per_call = [await batch(number) / number for _ in range(repeat)]
+    return min(per_call), statistics.median(per_call), number
+
+
+def git_commit():
+    def git(*args):
+        return subprocess.run(['git', *args], cwd=BENCH_DIR, capture_output=True, text=True).stdout.strip()
+    try:
+        commit = git('rev-parse', '--short', 'HEAD') or 'unknown'
+        return commit + ('-dirty' if git('status', '--porcelain', '--untracked-files=no') else '')
+    except OSError:
+        return 'unknown'
+
+
+async def run(args):
+    cases = analyzer_cases()
+    cleanups = []
+    modes = [('ram', None)] + ([('redis', args.redis)] if args.redis else [])
+    for mode, url in modes:
+        built = await redis_cases(mode, url)
+        if built is None:
+            print(f"skipping RedisBrain[{mode}]: {url} unreachable")
+            continue
+        cases += built[0]
+        cleanups.append(built[1])
+
+    results = {}
+    try:
+        for name, fn, is_async in cases:
+            if args.filter and args.filter not in name:
+                continue
+            best, median, number = await measure(fn, is_async, args.batch_time, args.repeat)
+            results[name] = {'min_us': round(best * 1e6, 3), 'median_us': round(median * 1e6, 3),
+                             'number': number, 'repeat': args.repeat}
+            print(f"{name:<48} {median * 1e6:12.2f} µs  (min {best * 1e6:.2f}, n={number})")
+    finally:
+        for cleanup in cleanups:
+            await cleanup()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filter', help='only cases whose name contains this')
+    parser.add_argument('--quick', action='store_true', help='short batches, fewer repeats')
+    parser.add_argument('--redis', help='local Redis URL for the RedisBrain redis-mode cases')
+    parser.add_argument('--output', help='result file (default benchmarks/results/<commit>.json)')
+    args = parser.parse_args()
+    args.batch_time, args.repeat = (0.02, 3) if args.quick else (0.2, 7)
+
+    logging.disable(logging.WARNING)  # RedisBrain/fetcher info logs would dominate the output
+    results = asyncio.run(run(args))
+
+    commit = git_commit()
+    report = {
+        'meta': {
+            'commit': commit,
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'orjson': chain_parser.ORJSON_AVAILABLE,
+            'machine': f"{platform.system()} {platform.machine()}",
+            'quick': args.quick
+        },
+        'results': results
+    }
+    output = args.output or os.path.join(BENCH_DIR, 'results', f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n{len(results)} results -> {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Candle Buffer: Columnar NumPy storage for OHLCV/OI bars
+Contiguous per-column arrays with zero-copy views for the analyzers
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+from utils import IST
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+CANDLE_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume', 'oi']
+_DTYPES = {
+    'timestamp': np.int64,  # epoch nanoseconds
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'volume': np.int64,
+    'oi': np.int64
+}
+
+
+def parse_timestamp(ts):
+    """ISO timestamp -> epoch nanoseconds"""
+    if isinstance(ts, (int, np.integer)):
+        return int(ts)
+    dt = datetime.fromisoformat(ts)
+    if dt.tzinfo is None:
+        dt = IST.localize(dt)
+    return (dt - _EPOCH) // _MICROSECOND * 1000
+
+
+class CandleBuffer:
+    """Preallocated, growable column store for one instrument's bars
+
+    `buf['close']` returns a view of the live rows (oldest first), so
+    analyzers can slice without copying. With `maxlen` set the buffer
+    keeps only the newest rows; old rows are dropped by moving the start
+    offset and compacted in bulk, keeping every column contiguous.
+    """
+
+    columns = CANDLE_COLUMNS
+
+    def __init__(self, capacity=512, maxlen=None):
+        self.maxlen = maxlen
+        self._start = 0
+        self._size = 0
+        self._data = {col: np.empty(capacity, dtype=dtype) for col, dtype in _DTYPES.items()}
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, col):
+        return self._data[col][self._start:self._start + self._size]
+
+    @property
+    def capacity(self):
+        return len(self._data['close'])
+
+    def clear(self):
+        self._start = 0
+        self._size = 0
+
+    def append(self, ts, o, h, l, c, v, oi=0):
+        """Append one bar"""
+        end = self._start + self._size
+        if end == self.capacity:
+            self._make_room()
+            end = self._start + self._size
+
+        self._write(end, ts, o, h, l, c, v, oi)
+        self._size += 1
+
+        if self.maxlen is not None and self._size > self.maxlen:
+            self._start += self._size - self.maxlen
+            self._size = self.maxlen
+
+    def replace_last(self, ts, o, h, l, c, v, oi=0):
+        """Overwrite the newest (forming) bar"""
+        if self._size == 0:
+            raise IndexError("replace_last on empty CandleBuffer")
+        self._write(self._start + self._size - 1, ts, o, h, l, c, v, oi)
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(*row)
+
+    def _write(self, i, ts, o, h, l, c, v, oi):
+        d = self._data
+        d['timestamp'][i] = parse_timestamp(ts)
+        d['open'][i] = o
+        d['high'][i] = h
+        d['low'][i] = l
+        d['close'][i] = c
+        d['volume'][i] = v
+        d['oi'][i] = oi or 0
+
+    def _make_room(self):
+        """Compact dropped rows away, or double capacity if full"""
+        if self._start > 0 and self._size <= self.capacity // 2:
+            for col, arr in self._data.items():
+                arr[:self._size] = arr[self._start:self._start + self._size]
+        else:
+            new_cap = self.capacity * 2
+            for col, arr in self._data.items():
+                grown = np.empty(new_cap, dtype=arr.dtype)
+                grown[:self._size] = arr[self._start:self._start + self._size]
+                self._data[col] = grown
+        self._start = 0
+
+    def to_dataframe(self):
+        """Pandas copy of the live rows (debugging / legacy callers)"""
+        df = pd.DataFrame({col: self[col].copy() for col in CANDLE_COLUMNS})
+        df['timestamp'] = pd.to_datetime(df['timestamp'], utc=True).dt.tz_convert(IST)
+        return df
@@ -0,0 +1,100 @@
+"""
+Candle Store: Incremental intraday candle cache
+Keeps the session's bars per instrument and merges only new/updated ones
+"""
+
+from candle_buffer import CandleBuffer
+from utils import setup_logger
+
+logger = setup_logger("candle_store")
+
+
+# ==================== Candle Series ====================
+class CandleSeries:
+    """One instrument's session candles, oldest first"""
+
+    def __init__(self):
+        self.buffer = CandleBuffer()
+        self.last_ts = None
+        self.last_row = None
+
+    def merge(self, candles):
+        """Merge an API candle payload; returns count of new/updated bars
+
+        Upstox returns the whole day newest-first, so the scan stops at the
+        first bar older than the last stored one. The last stored bar may
+        still be forming and is replaced if it changed.
+        """
+        if not candles:
+            return 0
+
+        newest_first = candles[0][0] >= candles[-1][0]
+        ordered = candles if newest_first else reversed(candles)
+
+        # New session (or gap in our data) -> start over
+        if self.last_ts and candles[0 if newest_first else -1][0][:10] != self.last_ts[:10]:
+            self.buffer.clear()
+            self.last_ts = None
+            self.last_row = None
+
+        last_ts = self.last_ts
+        fresh = []
+        updated = None
+
+        for candle in ordered:
+            ts = candle[0]
+            if last_ts is not None and ts < last_ts:
+                break
+            if ts == last_ts:
+                if list(candle) != self.last_row:
+                    updated = list(candle)
+                break
+            fresh.append(list(candle))
+
+        fresh.reverse()
+
+        # Only the changed tail is parsed and written
+        if updated is not None:
+            self.buffer.replace_last(*updated)
+            self.last_row = updated
+        if fresh:
+            self.buffer.extend(fresh)
+            self.last_ts = fresh[-1][0]
+            self.last_row = fresh[-1]
+
+        return len(fresh) + (1 if updated is not None else 0)
+
+
+# ==================== Candle Store ====================
+class CandleStore:
+    """Per-instrument candle cache"""
+
+    def __init__(self):
+        self.series = {}
+
+    def merge(self, key, candles):
+        """Merge candles for instrument; returns count of new/updated bars"""
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = CandleSeries()
+        return series.merge(candles)
+
+    def get(self, key):
+        """Session candles as a CandleBuffer (None if nothing stored)"""
+        series = self.series.get(key)
+        if series is None or len(series.buffer) == 0:
+            return None
+        return series.buffer
+
+    def latest(self, key):
+        """Timestamp string of the newest stored bar (None if nothing stored)"""
+        series = self.series.get(key)
+        return series.last_ts if series is not None else None
+
+    def frame(self, key):
+        """Session candles as a DataFrame, for debugging"""
+        buffer = self.get(key)
+        return buffer.to_dataframe() if buffer is not None else None
+
+    def __len__(self):
+        return len(self.series)
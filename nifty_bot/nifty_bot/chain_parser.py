@@ -0,0 +1,62 @@
+"""
+Chain Parser: Single-pass option chain decoding
+Fast JSON (orjson when installed) and one walk over the chain
+"""
+
+import json
+
+from chain_snapshot import ChainSnapshot, CHAIN_FIELDS
+from config import STRIKE_GAP
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+_EMPTY = {}
+
+
+def loads(raw):
+    """Decode a JSON body (bytes or str)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _side(options):
+    """(oi, volume, ltp) for one side; accepts nested market_data or flat fields"""
+    md = options.get('market_data')
+    if md is not None:
+        return md.get('oi', 0), md.get('volume', 0), md.get('ltp', 0)
+    return options.get('open_interest', 0), options.get('volume', 0), options.get('last_price', 0)
+
+
+def parse_option_chain(data, min_strike, max_strike, strike_gap=STRIKE_GAP):
+    """Strike window of a raw chain response -> ChainSnapshot
+
+    Walks the chain once, rejecting out-of-window strikes before touching
+    the nested option objects, and appends straight into column lists.
+    Accepts the list or dict response shape.
+    """
+    items = data.values() if isinstance(data, dict) else data
+    strikes = []
+    ce_oi, pe_oi, ce_vol, pe_vol, ce_ltp, pe_ltp = [], [], [], [], [], []
+
+    for item in items:
+        strike = item.get('strike_price')
+        if not strike or strike < min_strike or strike > max_strike:
+            continue
+
+        oi, vol, ltp = _side(item.get('call_options') or _EMPTY)
+        ce_oi.append(oi)
+        ce_vol.append(vol)
+        ce_ltp.append(ltp)
+        oi, vol, ltp = _side(item.get('put_options') or _EMPTY)
+        pe_oi.append(oi)
+        pe_vol.append(vol)
+        pe_ltp.append(ltp)
+        strikes.append(strike)
+
+    columns = dict(zip(CHAIN_FIELDS, (ce_oi, pe_oi, ce_vol, pe_vol, ce_ltp, pe_ltp)))
+    return ChainSnapshot(strikes, columns, strike_gap)
@@ -0,0 +1,106 @@
+"""
+Chain Snapshot: Array-backed option chain for one cycle
+Sorted strikes + parallel CE/PE arrays, sliceable around ATM
+"""
+
+from collections.abc import Mapping
+
+import numpy as np
+
+from config import STRIKE_GAP
+
+CHAIN_FIELDS = ('ce_oi', 'pe_oi', 'ce_vol', 'pe_vol', 'ce_ltp', 'pe_ltp')
+
+
+class ChainSnapshot(Mapping):
+    """Option chain as a sorted strike array plus one float64 array per field
+
+    Behaves as a read-only {strike: {'ce_oi': .., ...}} mapping so existing
+    dict consumers keep working, while `total()` / `window()` give
+    vectorized sums over any ATM±k sub-window via prefix sums.
+    """
+
+    def __init__(self, strikes, columns, strike_gap=STRIKE_GAP):
+        self.strike_gap = strike_gap
+        order = np.argsort(strikes, kind='stable')
+        self.strikes = np.asarray(strikes, dtype=np.int64)[order]
+        self.columns = {f: np.asarray(columns[f], dtype=np.float64)[order] for f in CHAIN_FIELDS}
+        self._index = {int(s): i for i, s in enumerate(self.strikes)}
+        self._prefix = {}
+
+    @classmethod
+    def from_dict(cls, strike_data, strike_gap=STRIKE_GAP):
+        """Build from {strike: {field: value}}"""
+        strikes = list(strike_data)
+        columns = {f: [strike_data[s].get(f, 0) for s in strikes] for f in CHAIN_FIELDS}
+        return cls(strikes, columns, strike_gap)
+
+    # ---------- mapping interface ----------
+    def __getitem__(self, strike):
+        i = self._index[strike]
+        return {f: float(self.columns[f][i]) for f in CHAIN_FIELDS}
+
+    def __contains__(self, strike):
+        return strike in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self.strikes)
+
+    # ---------- vectorized access ----------
+    def index(self, strike):
+        """Array index of strike (O(1)), or None"""
+        return self._index.get(strike)
+
+    def window(self, atm=None, num_strikes=None):
+        """(lo, hi) slice bounds for ATM±num_strikes; whole chain if not given or 0"""
+        if atm is None or not num_strikes:
+            return 0, len(self.strikes)
+        lo = np.searchsorted(self.strikes, atm - num_strikes * self.strike_gap, side='left')
+        hi = np.searchsorted(self.strikes, atm + num_strikes * self.strike_gap, side='right')
+        return int(lo), int(hi)
+
+    def total(self, field, atm=None, num_strikes=None):
+        """Sum of field over the ATM±num_strikes window"""
+        prefix = self._prefix.get(field)
+        if prefix is None:
+            prefix = self._prefix[field] = np.concatenate(([0.0], np.cumsum(self.columns[field])))
+        lo, hi = self.window(atm, num_strikes)
+        return float(prefix[hi] - prefix[lo])
+
+    def sub(self, atm, num_strikes):
+        """ChainSnapshot restricted to ATM±num_strikes"""
+        lo, hi = self.window(atm, num_strikes)
+        return ChainSnapshot(self.strikes[lo:hi], {f: self.columns[f][lo:hi] for f in CHAIN_FIELDS},
+                             self.strike_gap)
+
+
+# ==================== Self-check ====================
+def _self_check(seed=1, num_strikes=61):
+    """total() must match the analyzers' plain-dict path for every window,
+    including num_strikes=0 (full chain)
+    """
+    from analyzers import OIAnalyzer, VolumeAnalyzer
+
+    rng = np.random.default_rng(seed)
+    strikes = 24000 + STRIKE_GAP * (np.arange(num_strikes) - num_strikes // 2)
+    columns = {f: rng.integers(0, 1_000_000, num_strikes).astype(np.float64) for f in CHAIN_FIELDS}
+    snap = ChainSnapshot(strikes, columns)
+    plain = {s: snap[s] for s in snap}
+
+    checked = 0
+    for atm in (None, int(strikes[0]), int(strikes[num_strikes // 2]), int(strikes[-1]), int(strikes[3]) + 25):
+        for k in (None, 0, 1, 2, 5, num_strikes):
+            for fn in (OIAnalyzer.calculate_total_oi, VolumeAnalyzer.calculate_total_volume):
+                fast, slow = fn(snap, atm, k), fn(plain, atm, k)
+                if fast != slow:
+                    raise AssertionError(f"{fn.__qualname__}(atm={atm}, num_strikes={k}): "
+                                         f"ChainSnapshot {fast} != dict {slow}")
+                checked += 1
+    return checked
+
+
+if __name__ == "__main__":
+    print(f"ChainSnapshot totals match the dict path ({_self_check()} cases)")
@@ -0,0 +1,164 @@
+"""
+Clock: Injectable time source for every time-dependent component
+Real wall clock in production; simulated or step-driven for replay and tests
+"""
+
+import asyncio
+import math
+import time as time_module
+from datetime import datetime, timedelta
+
+import pytz
+
+IST = pytz.timezone('Asia/Kolkata')
+
+
+# ==================== Clocks ====================
+class RealClock:
+    """Wall clock"""
+
+    def now(self):
+        """Current IST datetime"""
+        return datetime.now(IST)
+
+    def time(self):
+        """Current epoch seconds"""
+        return time_module.time()
+
+    async def sleep(self, seconds):
+        await asyncio.sleep(seconds)
+
+
+class SimulatedClock:
+    """Clock that only moves when told to; sleeping fast-forwards it"""
+
+    def __init__(self, start):
+        self._now = self._localize(start)
+
+    @staticmethod
+    def _localize(dt):
+        if dt.tzinfo is None:
+            return IST.localize(dt)
+        if getattr(dt.tzinfo, 'zone', None) == IST.zone:
+            return dt  # already IST; skip the pytz conversion
+        return dt.astimezone(IST)
+
+    def now(self):
+        return self._now
+
+    def time(self):
+        return self._now.timestamp()
+
+    def set(self, dt):
+        """Jump to dt (e.g. the timestamp of a recorded cycle)"""
+        self._now = self._localize(dt)
+
+    def advance(self, seconds):
+        self._now += timedelta(seconds=seconds)
+
+    async def sleep(self, seconds):
+        self.advance(seconds)
+        await asyncio.sleep(0)
+
+
+class StepClock(SimulatedClock):
+    """Clock advanced only by `step()`; sleepers wake when their deadline passes
+
+    Lets a test drive the real run loop one tick at a time:
+    `await clock.step()` moves time on and lets due sleepers run.
+    """
+
+    def __init__(self, start, step_seconds=60):
+        super().__init__(start)
+        self.step_seconds = step_seconds
+        self._sleepers = []
+
+    async def sleep(self, seconds):
+        wake_at = self._now + timedelta(seconds=seconds)
+        if wake_at <= self._now:
+            await asyncio.sleep(0)
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._sleepers.append((wake_at, future))
+        await future
+
+    async def step(self, seconds=None):
+        """Advance one step (default step_seconds) and run due sleepers"""
+        self.advance(self.step_seconds if seconds is None else seconds)
+        pending = []
+        for wake_at, future in self._sleepers:
+            if wake_at <= self._now:
+                if not future.done():
+                    future.set_result(None)
+            else:
+                pending.append((wake_at, future))
+        self._sleepers = pending
+        await asyncio.sleep(0)
+
+    @property
+    def sleepers(self):
+        return len(self._sleepers)
+
+
+# ==================== Cycle Schedule ====================
+class CycleSchedule:
+    """Slots at `offset` seconds past every `interval` boundary (from midnight)
+
+    Slot times come from the clock, not from when the previous cycle
+    ended, so start times never drift. At most one cycle runs per slot;
+    a slot missed by more than `max_late` seconds is skipped rather than
+    run late (`missed` counts those for the last wait).
+    """
+
+    def __init__(self, interval=60, offset=0.0, max_late=30.0, clock=None):
+        self.interval = interval
+        self.offset = offset
+        self.max_late = max_late
+        self._clock = clock
+        self.last_slot = None
+        self.missed = 0
+
+    @property
+    def clock(self):
+        return self._clock or get_clock()
+
+    def slot_at(self, now):
+        """Latest slot time at or before now"""
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        elapsed = (now - midnight).total_seconds() - self.offset
+        index = math.floor(elapsed / self.interval)
+        return midnight + timedelta(seconds=index * self.interval + self.offset)
+
+    async def wait(self):
+        """Sleep until the next slot is due; returns (slot, seconds late)"""
+        step = timedelta(seconds=self.interval)
+        now = self.clock.now()
+        slot = self.slot_at(now)
+        if self.last_slot is not None and slot <= self.last_slot:
+            slot += step  # this slot already ran
+        elif (now - slot).total_seconds() > self.max_late:
+            slot += step
+        self.missed = round((slot - self.last_slot) / step) - 1 if self.last_slot is not None else 0
+
+        while (remaining := (slot - self.clock.now()).total_seconds()) > 0:
+            await self.clock.sleep(remaining)
+
+        self.last_slot = slot
+        return slot, (self.clock.now() - slot).total_seconds()
+
+
+# ==================== Global Clock ====================
+_clock = RealClock()
+
+
+def get_clock():
+    """Clock every module should read time from"""
+    return _clock
+
+
+def set_clock(clock):
+    """Install clock (None restores the wall clock); returns the previous one"""
+    global _clock
+    previous = _clock
+    _clock = clock if clock is not None else RealClock()
+    return previous
@@ -1,4 +1,4 @@
-═══════════════════════════════════════════════════════════════════════════════
+# ═══════════════════════════════════════════════════════════════════════════════
 # FILE 1: config.py (150 lines)
 # ═══════════════════════════════════════════════════════════════════════════════
 
@@ -10,19 +10,63 @@ All constants, thresholds, and instrument logic
 import os
 from datetime import datetime, timedelta, time
 
+from clock import get_clock
+
 # ==================== API Configuration ====================
 API_VERSION = 'v3'
 UPSTOX_BASE_URL = 'https://api.upstox.com'
 UPSTOX_QUOTE_URL_V3 = f'{UPSTOX_BASE_URL}/v3/quote'
 UPSTOX_HISTORICAL_URL_V3 = f'{UPSTOX_BASE_URL}/v3/historical-candle'
 UPSTOX_OPTION_CHAIN_URL = f'{UPSTOX_BASE_URL}/v2/option/chain'
+UPSTOX_FEED_AUTHORIZE_URL = f'{UPSTOX_BASE_URL}/v3/feed/market-data-feed/authorize'
 
 UPSTOX_ACCESS_TOKEN = os.getenv('UPSTOX_ACCESS_TOKEN', '')
 
 # ==================== Memory & Storage ====================
 REDIS_URL = os.getenv('REDIS_URL', None)
 MEMORY_TTL_SECONDS = 14400  # 4 hours
+MEMORY_MAX_STRIKES = int(os.getenv('MEMORY_MAX_STRIKES', '0')) or None  # RAM strike cap, None = unbounded
+REDIS_CALL_TIMEOUT = 0.5  # seconds per Redis call
+REDIS_CONNECT_TIMEOUT = 5
+REDIS_RETRY_SECONDS = 30  # skip Redis this long after a failure
+REDIS_MAX_CONNECTIONS = 10
 SCAN_INTERVAL = 60  # seconds
+CYCLE_OFFSET_SECONDS = float(os.getenv('CYCLE_OFFSET_SECONDS', '3'))  # start this long after each minute boundary
+CYCLE_MAX_LATE_SECONDS = 30  # a slot missed by more is skipped, not run late
+CANDLE_ROLLOVER_RETRIES = 3  # re-polls when the previous minute's bar isn't out yet
+CANDLE_ROLLOVER_RETRY_DELAY = 1.0  # seconds
+FETCH_TIMEOUT = 15  # seconds, per concurrent fetch call
+
+# ==================== API Rate Limits ====================
+# (per second, per minute) per endpoint class, shared by all pipelines
+RATE_LIMITS = {
+    'quote': (25, 250),
+    'candles': (25, 250),
+    'option_chain': (10, 100),
+    'default': (10, 100)
+}
+RATE_LIMIT_PENALTY_SECONDS = 60  # budget stays shrunk this long after a 429
+RATE_LIMIT_MIN_SCALE = 0.125
+
+# ==================== HTTP Transport ====================
+HTTP_POOL_SIZE = 20
+HTTP_KEEPALIVE_SECONDS = 75  # > SCAN_INTERVAL so connections survive between cycles
+HTTP_DNS_TTL = 300
+HTTP_CONNECT_TIMEOUT = 3  # seconds
+HTTP_REQUEST_TIMEOUT = 8  # seconds, per attempt
+HTTP_RETRY_BACKOFF = 0.25  # seconds, doubled per retry
+HTTP_PREWARM_CONNECTIONS = 4
+HTTP_HEDGE_ENABLED = os.getenv('HTTP_HEDGE_ENABLED', 'false').lower() == 'true'
+HTTP_HEDGE_MIN_DELAY = 0.2  # never hedge sooner than this
+HTTP_HEDGE_MIN_SAMPLES = 20
+HTTP_LATENCY_WINDOW = 200
+
+# ==================== Market Feed ====================
+MARKET_FEED_ENABLED = os.getenv('MARKET_FEED_ENABLED', 'false').lower() == 'true'
+MARKET_FEED_URL = os.getenv('MARKET_FEED_URL', '')  # empty = authorize via Upstox
+FEED_STALE_SECONDS = 5  # ticks older than this fall back to REST
+FEED_HEARTBEAT_SECONDS = 10
+FEED_RECONNECT_MAX_DELAY = 30
 
 # ==================== Market Timings ====================
 PREMARKET_START = time(9, 10)
@@ -30,6 +74,7 @@ PREMARKET_END = time(9, 20)
 SIGNAL_START = time(9, 25)
 MARKET_CLOSE = time(15, 30)
 WARMUP_MINUTES = 10
+SESSION_MINUTES = 375  # 09:15-15:30, RAM OI ring size
 
 # ==================== Trading Thresholds ====================
 OI_THRESHOLD_STRONG = 3.0
@@ -42,11 +87,16 @@ PCR_BULLISH = 1.2
 PCR_BEARISH = 0.8
 
 ATR_PERIOD = 14
+ATR_SMOOTHING = 'sma'  # 'sma' (matches rolling mean) or 'wilder'
 ATR_TARGET_MULTIPLIER = 2.5
 ATR_SL_MULTIPLIER = 1.5
 ATR_SL_GAMMA_MULTIPLIER = 2.0
 
 VWAP_BUFFER = 3
+
+# Strikes each side of ATM: parsed/stored vs. used for totals, PCR and flow
+CHAIN_STRIKE_WINDOW = int(os.getenv('CHAIN_STRIKE_WINDOW', '20'))  # 0 = full chain
+ANALYSIS_STRIKE_WINDOW = int(os.getenv('ANALYSIS_STRIKE_WINDOW', '2'))
 MIN_CANDLE_SIZE = 5
 
 # ==================== Risk Management ====================
@@ -71,10 +121,30 @@ EXIT_CANDLE_REJECTION_MULTIPLIER = 2  # Wick > 2x body
 TELEGRAM_ENABLED = os.getenv('TELEGRAM_ENABLED', 'false').lower() == 'true'
 TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN', '')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID', '')
+ALERT_QUEUE_SIZE = 100  # trade alerts are never dropped
+ALERT_RATE_LIMIT = (1, 20)  # messages per second, per minute (per chat)
+ALERT_MAX_ATTEMPTS = 5
+ALERT_RETRY_BASE = 1.0  # seconds, doubled per attempt
+ALERT_FLUSH_SECONDS = 10  # max wait for pending alerts on shutdown
 
 # ==================== Logging ====================
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
 
+# Prometheus /metrics endpoint; 0 = off
+METRICS_PORT = int(os.getenv('METRICS_PORT', '0'))
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+
+# Profiling (PROFILE=true arms at start-up, SIGUSR1 toggles at runtime)
+PROFILE_ENABLED = os.getenv('PROFILE', 'false').lower() == 'true'
+PROFILE_CYCLES = int(os.getenv('PROFILE_CYCLES', '5'))
+PROFILE_MODE = os.getenv('PROFILE_MODE', 'cprofile')  # cprofile | sample
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+PROFILE_TARGETS = os.getenv('PROFILE_TARGETS', '')  # e.g. "TechnicalAnalyzer.analyze_candle"; empty = whole cycle
+PROFILE_SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+
+# Session recording (raw API responses per cycle, gzip JSONL); empty = off
+RECORD_DIR = os.getenv('RECORD_DIR', '')
+
 # ==================== NIFTY Instrument Config ====================
 NIFTY_SPOT_KEY = "NSE_INDEX|Nifty 50"
 NIFTY_INDEX_KEY = "NSE_INDEX|Nifty 50"
@@ -82,10 +152,13 @@ STRIKE_GAP = 50
 LOT_SIZE = 50
 ATR_FALLBACK = 30
 
+# Indices to run in this process (see instruments.PROFILES)
+INDICES = [name.strip() for name in os.getenv('INDICES', 'NIFTY').split(',') if name.strip()]
+
 
 def get_next_tuesday_expiry():
     """Get next Tuesday expiry (weekly)"""
-    today = datetime.now()
+    today = get_clock().now()
     days_ahead = 1 - today.weekday()
     if days_ahead <= 0:
         days_ahead += 7
@@ -112,7 +185,9 @@ def calculate_atm_strike(spot_price):
 
 
 def get_strike_range(atm_strike, num_strikes=2):
-    """Get min/max strike range"""
+    """Get min/max strike range (num_strikes=0 -> full chain)"""
+    if not num_strikes:
+        return float('-inf'), float('inf')
     min_strike = atm_strike - (num_strikes * STRIKE_GAP)
     max_strike = atm_strike + (num_strikes * STRIKE_GAP)
     return min_strike, max_strike
@@ -8,21 +8,31 @@ Handles all data fetching and OI storage
 """
 
 import asyncio
-import aiohttp
 import json
 import time as time_module
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+from typing import Optional
 from urllib.parse import quote
-import pandas as pd
 
 try:
-    import redis
+    import redis.asyncio as redis
     REDIS_AVAILABLE = True
 except ImportError:
     REDIS_AVAILABLE = False
 
 from config import *
-from utils import IST, setup_logger
+from utils import IST, setup_logger, get_ist_time
+from clock import get_clock
+from candle_buffer import CandleBuffer
+from candle_store import CandleStore
+import chain_parser
+from chain_snapshot import ChainSnapshot
+from oi_ring import OIRing
+from instruments import NIFTY
+from ratelimit import RateLimiter
+from transport import create_session, prewarm, LatencyTracker, hedged
+from metrics import HTTP_SECONDS, HTTP_RETRIES, HTTP_THROTTLED, REDIS_ERRORS, REDIS_FALLBACK, STAGE_SECONDS
 
 logger = setup_logger("data_manager")
 
@@ -31,13 +41,14 @@ logger = setup_logger("data_manager")
 class UpstoxClient:
     """Upstox API V3 Client"""
     
-    def __init__(self):
+    def __init__(self, limiter=None, hedge=HTTP_HEDGE_ENABLED):
         self.session = None
-        self._rate_limit_delay = 0.1
-        self._last_request = 0
+        self.limiter = limiter or RateLimiter()
+        self.latency = LatencyTracker()
+        self.hedge = hedge
     
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+        self.session = create_session()
         return self
     
     async def __aexit__(self, *args):
@@ -47,34 +58,57 @@ class UpstoxClient:
     def _get_headers(self):
         return {
             'Authorization': f'Bearer {UPSTOX_ACCESS_TOKEN}',
-            'Accept': 'application/json'
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate'
         }
     
-    async def _rate_limit(self):
-        elapsed = asyncio.get_event_loop().time() - self._last_request
-        if elapsed < self._rate_limit_delay:
-            await asyncio.sleep(self._rate_limit_delay - elapsed)
-        self._last_request = asyncio.get_event_loop().time()
+    async def prewarm(self):
+        """Open pooled connections to Upstox before the first real request"""
+        return await prewarm(self.session, UPSTOX_BASE_URL)
     
-    async def _request(self, url, params=None):
-        """Make API request with retry"""
-        await self._rate_limit()
+    async def _send(self, url, params, endpoint):
+        """One rate-limited GET -> (status, body bytes or None)"""
+        await self.limiter.acquire(endpoint)
+        start = time_module.perf_counter()
+        try:
+            async with self.session.get(url, headers=self._get_headers(), params=params) as resp:
+                self.limiter.observe(endpoint, resp.status, resp.headers)
+                status = resp.status
+                body = await resp.read() if status == 200 else None
+        except Exception:
+            HTTP_SECONDS.observe(time_module.perf_counter() - start, endpoint, 'error')
+            raise
+        
+        elapsed = time_module.perf_counter() - start
+        HTTP_SECONDS.observe(elapsed, endpoint, str(status))
+        if status == 200:
+            self.latency.record(endpoint, elapsed)
+        return status, body
+    
+    async def _request(self, url, params=None, endpoint='default'):
+        """Make API request with retry (rate limited per endpoint class)
         
+        With hedging on, a duplicate is sent once the first attempt runs
+        past the endpoint's p95 latency and the faster answer wins.
+        """
         for attempt in range(3):
             try:
-                async with self.session.get(url, headers=self._get_headers(), params=params) as resp:
-                    if resp.status == 200:
-                        return await resp.json()
-                    elif resp.status == 429:
-                        await asyncio.sleep(2 ** attempt)
-                        continue
-                    else:
-                        logger.error(f"API error: {resp.status}")
-                        return None
+                delay = self.latency.hedge_delay(endpoint) if self.hedge else None
+                status, body = await hedged(lambda: self._send(url, params, endpoint), delay)
+                if status == 200:
+                    return chain_parser.loads(body)
+                elif status == 429:
+                    HTTP_THROTTLED.inc(endpoint)
+                    HTTP_RETRIES.inc(endpoint)
+                    continue  # limiter now blocks for Retry-After
+                else:
+                    logger.error(f"API error: {status}")
+                    return None
             except Exception as e:
-                logger.error(f"Request failed: {e}")
+                logger.error(f"Request failed: {e or type(e).__name__}")
                 if attempt < 2:
-                    await asyncio.sleep(2)
+                    HTTP_RETRIES.inc(endpoint)
+                    await asyncio.sleep(HTTP_RETRY_BACKOFF * 2 ** attempt)
                     continue
                 return None
         return None
@@ -83,167 +117,293 @@ class UpstoxClient:
         """Get market quote"""
         encoded = quote(instrument_key, safe='')
         url = f"{UPSTOX_QUOTE_URL_V3}?symbol={encoded}"
-        data = await self._request(url)
+        data = await self._request(url, endpoint='quote')
         return data['data'].get(instrument_key) if data and 'data' in data else None
     
     async def get_candles(self, instrument_key, interval='1minute'):
         """Get historical candles"""
         encoded = quote(instrument_key, safe='')
         url = f"{UPSTOX_HISTORICAL_URL_V3}/intraday/{encoded}/{interval}"
-        data = await self._request(url)
+        data = await self._request(url, endpoint='candles')
         return data['data'] if data and 'data' in data else None
     
     async def get_option_chain(self, instrument_key, expiry_date):
         """Get option chain"""
         encoded = quote(instrument_key, safe='')
         url = f"{UPSTOX_OPTION_CHAIN_URL}?instrument_key={encoded}&expiry_date={expiry_date}"
-        data = await self._request(url)
+        data = await self._request(url, endpoint='option_chain')
         return data['data'] if data and 'data' in data else None
 
 
 # ==================== Redis Memory Manager ====================
+# KEYS: candidate minute hashes. ARGV: repeated (field, n, key_index * n).
+# Returns, per query, the field from the first candidate hash that has it.
+NEAREST_SNAPSHOT_LUA = """
+local out = {}
+local i = 1
+while i <= #ARGV do
+    local field = ARGV[i]
+    local n = tonumber(ARGV[i + 1])
+    local found = ''
+    for j = 0, n - 1 do
+        local value = redis.call('HGET', KEYS[tonumber(ARGV[i + 2 + j])], field)
+        if value then
+            found = value
+            break
+        end
+    end
+    out[#out + 1] = found
+    i = i + 2 + n
+end
+return out
+"""
+
+
 class RedisBrain:
-    """Memory manager for OI snapshots"""
+    """Memory manager for OI snapshots
+    
+    Redis calls go through an asyncio connection pool with a per-call
+    timeout, so a slow or dead Redis never blocks the event loop. After a
+    failure Redis is skipped for REDIS_RETRY_SECONDS and RAM is used.
+    
+    Keys are prefixed with `namespace`. `child(namespace)` returns a brain
+    for another index that shares this one's connection and back-off but
+    keeps its own keys, RAM ring and warmup clock.
+    """
     
-    def __init__(self):
-        self.client = None
-        self.memory = {}
-        self.memory_timestamps = {}
+    def __init__(self, namespace='nifty', parent=None):
+        self.namespace = namespace
+        self.root = parent.root if parent else self
+        self._client = None
+        self.ring = OIRing()
         self.snapshot_count = 0
-        self.startup_time = datetime.now(IST)
+        self.startup_time = get_ist_time()
         self.premarket_loaded = False
+        self._redis_down_until = 0.0
+        self._nearest_script = None
+    
+    def child(self, namespace):
+        """Brain for another namespace on the same connection"""
+        return RedisBrain(namespace, parent=self)
+    
+    @property
+    def client(self):
+        return self.root._client
+    
+    async def connect(self):
+        """Connect to Redis (falls back to RAM); no-op for children"""
+        if self.root is not self:
+            return
+        if not (REDIS_AVAILABLE and REDIS_URL):
+            logger.info("💾 Using RAM-only mode")
+            return
         
-        if REDIS_AVAILABLE and REDIS_URL:
+        try:
+            pool = redis.ConnectionPool.from_url(
+                REDIS_URL,
+                decode_responses=True,
+                max_connections=REDIS_MAX_CONNECTIONS,
+                socket_timeout=REDIS_CALL_TIMEOUT,
+                socket_connect_timeout=REDIS_CONNECT_TIMEOUT
+            )
+            self._client = redis.Redis(connection_pool=pool)
+            await asyncio.wait_for(self.client.ping(), REDIS_CONNECT_TIMEOUT)
+            logger.info("✅ Redis connected")
+        except Exception as e:
+            logger.warning(f"⚠️ Redis failed: {e or type(e).__name__}. Using RAM.")
+            await self.close()
+    
+    async def close(self):
+        """Release the Redis pool"""
+        if self.root is self and self._client:
             try:
-                self.client = redis.from_url(REDIS_URL, decode_responses=True)
-                self.client.ping()
-                logger.info("✅ Redis connected")
-            except Exception as e:
-                logger.warning(f"⚠️ Redis failed: {e}. Using RAM.")
-                self.client = None
-        else:
-            logger.info("💾 Using RAM-only mode")
+                await self._client.aclose()
+            except Exception:
+                pass
+            self._client = None
+            self._nearest_script = None
     
-    def save_total_oi(self, ce, pe):
-        """Save total OI snapshot"""
-        now = datetime.now(IST).replace(second=0, microsecond=0)
-        key = f"nifty:total:{now.strftime('%Y%m%d_%H%M')}"
-        value = json.dumps({'ce': ce, 'pe': pe})
-        
-        if self.client:
+    def _redis_usable(self):
+        return self.client is not None and time_module.monotonic() >= self.root._redis_down_until
+    
+    async def _call(self, coro):
+        """Run one Redis call under the per-call timeout"""
+        try:
+            return await asyncio.wait_for(coro, REDIS_CALL_TIMEOUT)
+        except Exception as e:
+            REDIS_ERRORS.inc(type(e).__name__)
+            self.root._redis_down_until = time_module.monotonic() + REDIS_RETRY_SECONDS
+            logger.warning(f"⚠️ Redis call failed ({type(e).__name__}), using RAM for {REDIS_RETRY_SECONDS}s")
+            raise
+    
+    @staticmethod
+    def _stamp(dt):
+        return dt.replace(second=0, microsecond=0).strftime('%Y%m%d_%H%M')
+    
+    @staticmethod
+    def _minute(dt):
+        return int(dt.timestamp() // 60)
+    
+    async def _write(self, now, total, strike_data):
+        """Write one minute's totals/strikes: one pipelined Redis call, else RAM ring"""
+        if self._redis_usable():
             try:
-                self.client.setex(key, MEMORY_TTL_SECONDS, value)
-            except:
-                self.memory[key] = value
-                self.memory_timestamps[key] = time_module.time()
-        else:
-            self.memory[key] = value
-            self.memory_timestamps[key] = time_module.time()
+                fields = {}
+                if total is not None:
+                    fields['total'] = json.dumps({'ce': total[0], 'pe': total[1]})
+                for strike, data in strike_data.items():
+                    fields[str(strike)] = json.dumps(data)
+                
+                key = f"{self.namespace}:oi:{self._stamp(now)}"
+                pipe = self.client.pipeline(transaction=True)
+                pipe.hset(key, mapping=fields)
+                pipe.expire(key, MEMORY_TTL_SECONDS)
+                await self._call(pipe.execute())
+                return
+            except Exception:
+                pass
         
-        self.snapshot_count += 1
-        self._cleanup()
+        if self.client is not None:
+            REDIS_FALLBACK.inc('write')
+        minute = self._minute(now)
+        wall = get_clock().time()
+        if total is not None:
+            self.ring.put_total(minute, total[0], total[1], wall)
+        for strike, data in strike_data.items():
+            self.ring.put_strike(minute, strike, data.get('ce_oi', 0), data.get('pe_oi', 0), wall)
     
-    def get_total_oi_change(self, current_ce, current_pe, minutes_ago=15):
-        """Get OI change from X minutes ago"""
-        target = datetime.now(IST) - timedelta(minutes=minutes_ago)
-        target = target.replace(second=0, microsecond=0)
-        key = f"nifty:total:{target.strftime('%Y%m%d_%H%M')}"
+    @staticmethod
+    def _offsets(tolerance):
+        """Minute offsets in search order: 0, -1, +1, -2, +2, ..."""
+        offsets = [0]
+        for distance in range(1, tolerance + 1):
+            offsets += [-distance, distance]
+        return offsets
+    
+    async def _lookup(self, queries):
+        """Nearest (ce, pe) snapshot per (field, target, tolerance) query
+        
+        All queries go to Redis in one Lua call; misses fall through to
+        the RAM ring.
+        """
+        results = [None] * len(queries)
+        served = False
         
-        past_str = None
-        if self.client:
+        if queries and self._redis_usable():
+            keys, key_index, args = [], {}, []
+            for field, target, tolerance in queries:
+                candidates = []
+                for offset in self._offsets(tolerance):
+                    key = f"{self.namespace}:oi:{self._stamp(target + timedelta(minutes=offset))}"
+                    if key not in key_index:
+                        keys.append(key)
+                        key_index[key] = len(keys)
+                    candidates.append(key_index[key])
+                args += [field, len(candidates), *candidates]
+            
             try:
-                past_str = self.client.get(key)
-            except:
+                if self._nearest_script is None:
+                    self._nearest_script = self.client.register_script(NEAREST_SNAPSHOT_LUA)
+                values = await self._call(self._nearest_script(keys=keys, args=args))
+                for i, ((field, _, _), value) in enumerate(zip(queries, values)):
+                    if value:
+                        past = json.loads(value)
+                        results[i] = ((past['ce'], past['pe']) if field == 'total'
+                                      else (past.get('ce_oi', 0), past.get('pe_oi', 0)))
+                served = True
+            except Exception:
                 pass
         
-        if not past_str:
-            past_str = self.memory.get(key)
-        
-        if not past_str:
-            return 0.0, 0.0, False
+        if queries and self.client is not None and not served:
+            REDIS_FALLBACK.inc('lookup')
         
-        try:
-            past = json.loads(past_str)
-            ce_chg = ((current_ce - past['ce']) / past['ce'] * 100) if past['ce'] > 0 else 0
-            pe_chg = ((current_pe - past['pe']) / past['pe'] * 100) if past['pe'] > 0 else 0
-            return ce_chg, pe_chg, True
-        except:
-            return 0.0, 0.0, False
-    
-    def save_strike(self, strike, data):
-        """Save strike OI snapshot"""
-        now = datetime.now(IST).replace(second=0, microsecond=0)
-        key = f"nifty:strike:{strike}:{now.strftime('%Y%m%d_%H%M')}"
-        value = json.dumps(data)
-        
-        if self.client:
-            try:
-                self.client.setex(key, MEMORY_TTL_SECONDS, value)
-            except:
-                self.memory[key] = value
-                self.memory_timestamps[key] = time_module.time()
-        else:
-            self.memory[key] = value
-            self.memory_timestamps[key] = time_module.time()
+        wall = get_clock().time()
+        for i, (field, target, tolerance) in enumerate(queries):
+            if results[i] is None:
+                minute = self._minute(target)
+                if field == 'total':
+                    results[i] = self.ring.get_total(minute, wall)
+                else:
+                    results[i] = self.ring.get_strike(minute, field, wall, tolerance)
         
-        self.snapshot_count += 1
+        return results
     
-    def get_strike_oi_change(self, strike, current_data, minutes_ago=15):
-        """Get strike OI change"""
-        target = datetime.now(IST) - timedelta(minutes=minutes_ago)
-        target = target.replace(second=0, microsecond=0)
-        key = f"nifty:strike:{strike}:{target.strftime('%Y%m%d_%H%M')}"
+    @staticmethod
+    def _pct_change(current, past):
+        return ((current - past) / past * 100) if past > 0 else 0
+    
+    async def get_changes(self, total_ce, total_pe, strike_data, strikes=(), windows=(5, 15),
+                          tolerance=3):
+        """Total and per-strike OI changes for several windows in one round trip
         
-        past_str = None
-        if self.client:
-            try:
-                past_str = self.client.get(key)
-            except:
-                pass
+        Returns {'total': {window: (ce_chg, pe_chg, found)},
+                 strike: {window: (ce_chg, pe_chg, found)}, ...}
+        Totals use the exact minute; strikes the nearest within ±tolerance.
+        """
+        now = get_ist_time()
+        queries = []
+        for window in windows:
+            target = now - timedelta(minutes=window)
+            queries.append(('total', target, 0))
+            queries += [(strike, target, tolerance) for strike in strikes]
         
-        if not past_str:
-            past_str = self.memory.get(key)
+        pasts = iter(await self._lookup(queries))
+        changes = {'total': {}}
+        changes.update({strike: {} for strike in strikes})
         
-        # Try ±3 min tolerance if exact not found
-        if not past_str:
-            for offset in [-1, 1, -2, 2, -3, 3]:
-                alt = target + timedelta(minutes=offset)
-                alt_key = f"nifty:strike:{strike}:{alt.strftime('%Y%m%d_%H%M')}"
-                
-                if self.client:
-                    try:
-                        past_str = self.client.get(alt_key)
-                        if past_str:
-                            break
-                    except:
-                        pass
+        for window in windows:
+            for name in ['total', *strikes]:
+                past = next(pasts)
+                if name == 'total':
+                    current_ce, current_pe = total_ce, total_pe
+                else:
+                    current = strike_data.get(name, {})
+                    current_ce, current_pe = current.get('ce_oi', 0), current.get('pe_oi', 0)
                 
-                if not past_str:
-                    past_str = self.memory.get(alt_key)
-                    if past_str:
-                        break
+                if past is None:
+                    changes[name][window] = (0.0, 0.0, False)
+                else:
+                    changes[name][window] = (self._pct_change(current_ce, past[0]),
+                                             self._pct_change(current_pe, past[1]), True)
         
-        if not past_str:
-            return 0.0, 0.0, False
-        
-        try:
-            past = json.loads(past_str)
-            ce_chg = ((current_data.get('ce_oi', 0) - past.get('ce_oi', 0)) / 
-                     past.get('ce_oi', 1) * 100) if past.get('ce_oi', 0) > 0 else 0
-            pe_chg = ((current_data.get('pe_oi', 0) - past.get('pe_oi', 0)) / 
-                     past.get('pe_oi', 1) * 100) if past.get('pe_oi', 0) > 0 else 0
-            return ce_chg, pe_chg, True
-        except:
-            return 0.0, 0.0, False
+        return changes
+    
+    async def save_snapshot(self, total_ce, total_pe, strike_data):
+        """Save total OI and every strike for this minute in one round trip"""
+        await self._write(get_ist_time(), (total_ce, total_pe), strike_data)
+        self.snapshot_count += 1 + len(strike_data)
+        self._cleanup()
+    
+    async def save_total_oi(self, ce, pe):
+        """Save total OI snapshot"""
+        await self._write(get_ist_time(), (ce, pe), {})
+        self.snapshot_count += 1
+        self._cleanup()
+    
+    async def get_total_oi_change(self, current_ce, current_pe, minutes_ago=15):
+        """Get OI change from X minutes ago"""
+        changes = await self.get_changes(current_ce, current_pe, {}, windows=(minutes_ago,))
+        return changes['total'][minutes_ago]
+    
+    async def save_strike(self, strike, data):
+        """Save strike OI snapshot"""
+        await self._write(get_ist_time(), None, {strike: data})
+        self.snapshot_count += 1
+    
+    async def get_strike_oi_change(self, strike, current_data, minutes_ago=15):
+        """Get strike OI change (nearest snapshot within ±3 min)"""
+        changes = await self.get_changes(0, 0, {strike: current_data}, strikes=(strike,),
+                                         windows=(minutes_ago,))
+        return changes[strike][minutes_ago]
     
     def is_warmed_up(self, minutes=10):
         """Check if enough data collected"""
-        elapsed = (datetime.now(IST) - self.startup_time).total_seconds() / 60
+        elapsed = (get_ist_time() - self.startup_time).total_seconds() / 60
         return elapsed >= minutes
     
     def get_stats(self):
         """Get memory statistics"""
-        elapsed = (datetime.now(IST) - self.startup_time).total_seconds() / 60
+        elapsed = (get_ist_time() - self.startup_time).total_seconds() / 60
         return {
             'snapshot_count': self.snapshot_count,
             'elapsed_minutes': elapsed,
@@ -253,15 +413,8 @@ class RedisBrain:
         }
     
     def _cleanup(self):
-        """Clean expired RAM entries"""
-        if not self.memory:
-            return
-        now = time_module.time()
-        expired = [k for k, ts in self.memory_timestamps.items() 
-                  if now - ts > MEMORY_TTL_SECONDS]
-        for key in expired:
-            self.memory.pop(key, None)
-            self.memory_timestamps.pop(key, None)
+        """Expire RAM snapshots past TTL"""
+        self.ring.expire(get_clock().time())
     
     async def load_previous_day_data(self):
         """Load previous day data during premarket"""
@@ -273,17 +426,250 @@ class RedisBrain:
 
 
 # ==================== Data Fetcher ====================
+@dataclass
+class FetchResult:
+    """Outcome of one concurrent fetch stage"""
+    spot: Optional[float] = None
+    futures: Optional[float] = None  # live futures LTP (feed mode only)
+    candles: Optional[CandleBuffer] = None
+    atm: Optional[int] = None
+    strike_data: Optional[dict] = None
+    errors: dict = field(default_factory=dict)
+    elapsed: float = 0.0
+    
+    @property
+    def ok(self):
+        return not self.errors
+
+
 class DataFetcher:
     """High-level data fetching"""
     
-    def __init__(self, client):
+    def __init__(self, client, feed=None, profile=NIFTY):
         self.client = client
+        self.feed = feed
+        self.profile = profile
+        self.option_keys = {}  # strike -> (ce_key, pe_key), for feed mode
+        self.futures_key = None  # futures contract subscribed on the feed
+        self.candles = CandleStore()
+    
+    async def fetch_all(self, timeout=FETCH_TIMEOUT):
+        """Fetch spot, futures and option chain concurrently
+        
+        Each call runs under its own deadline; failures are recorded per call
+        in `errors` and whatever did arrive is kept. In feed mode spot and
+        chain come from live ticks and REST is only used to fill gaps.
+        """
+        result = FetchResult()
+        start = time_module.perf_counter()
+        
+        if self.feed is not None:
+            await self._track_futures()
+        use_feed_chain = self.feed is not None and bool(self.option_keys)
+        calls = [
+            self._guarded('spot', self._get_spot(), timeout, result.errors),
+            self._guarded('futures', self._get_futures(), timeout, result.errors)
+        ]
+        if not use_feed_chain:
+            calls.append(self._guarded('chain', self._get_raw_chain(), timeout, result.errors))
+        
+        spot, candles, *rest = await asyncio.gather(*calls)
+        chain = rest[0] if rest else None
+        
+        result.spot = spot
+        result.candles = candles
+        result.futures = self._futures_from_feed()
+        
+        if use_feed_chain and spot is not None:
+            feed_chain = self._chain_from_feed(spot)
+            if feed_chain:
+                result.atm, result.strike_data = feed_chain
+            else:
+                # ATM moved past subscribed strikes or ticks went stale
+                chain = await self._guarded('chain', self._get_raw_chain(), timeout, result.errors)
+        
+        # Strike window depends on spot, so filter only once both are in
+        if chain is not None and spot is not None:
+            try:
+                parse_start = time_module.perf_counter()
+                atm, strike_data = self.parse_option_chain(chain, spot, self.profile)
+                STAGE_SECONDS.observe(time_module.perf_counter() - parse_start,
+                                      self.profile.name, 'chain_parse')
+                result.atm = atm
+                result.strike_data = strike_data
+                if self.feed is not None:
+                    await self._track_options(chain, atm)
+            except Exception as e:
+                result.errors['chain'] = f"parse error: {e}"
+        
+        result.elapsed = time_module.perf_counter() - start
+        return result
+    
+    @staticmethod
+    async def _guarded(name, coro, timeout, errors):
+        """Await one fetch, recording timeout/error/empty instead of raising"""
+        try:
+            value = await asyncio.wait_for(coro, timeout)
+        except asyncio.TimeoutError:
+            errors[name] = f"timeout after {timeout}s"
+            return None
+        except Exception as e:
+            errors[name] = str(e) or type(e).__name__
+            return None
+        
+        if value is None:
+            errors[name] = "no data"
+        return value
+    
+    async def _get_spot(self):
+        if self.feed is not None:
+            tick = self.feed.state.get(self.profile.spot_key)
+            if tick and tick.ltp > 0:
+                return tick.ltp
+        
+        data = await self.client.get_quote(self.profile.spot_key)
+        return float(data.get('last_price')) if data else None
+    
+    def _futures_from_feed(self):
+        """Live futures LTP from the feed, or None (callers use the last candle close)"""
+        if self.feed is None:
+            return None
+        tick = self.feed.state.get(self.profile.futures_key())
+        return tick.ltp if tick and tick.ltp > 0 else None
+    
+    async def _get_futures(self):
+        key = self.profile.futures_key()
+        data = await self.client.get_candles(key, '1minute')
+        
+        if not data or 'candles' not in data:
+            return None
+        
+        candles = data['candles']
+        if not candles:
+            return None
+        
+        self.candles.merge(key, candles)
+        return self.candles.get(key)
+    
+    def candles_rolled_over(self, slot):
+        """True once the futures candles include the bar for `slot`'s minute
+        
+        The intraday payload ends with the forming bar (CandleStore replaces
+        it in place), so the previous minute has closed only once a bar for
+        the new minute exists.
+        """
+        latest = self.candles.latest(self.profile.futures_key())
+        if latest is None:
+            return False
+        forming = slot.replace(second=0, microsecond=0)
+        latest = datetime.fromisoformat(latest)
+        if latest.tzinfo is None:
+            latest = IST.localize(latest)
+        if forming.tzinfo is None:
+            forming = IST.localize(forming)
+        return latest >= forming
+    
+    async def refresh_candles(self, candles, slot, retries=CANDLE_ROLLOVER_RETRIES,
+                              delay=CANDLE_ROLLOVER_RETRY_DELAY):
+        """Re-poll futures candles (bounded) until the last minute's bar is in
+        
+        Returns (candles, rolled_over); the newest data seen is kept either way.
+        """
+        for _ in range(retries):
+            if self.candles_rolled_over(slot):
+                return candles, True
+            await get_clock().sleep(delay)
+            try:
+                candles = await self._get_futures() or candles
+            except Exception as e:
+                logger.warning(f"Candle re-poll failed: {e}")
+        return candles, self.candles_rolled_over(slot)
+    
+    async def _get_raw_chain(self):
+        expiry = self.profile.next_expiry()
+        return await self.client.get_option_chain(self.profile.index_key, expiry)
+    
+    def _chain_from_feed(self, spot_price):
+        """Build the chain snapshot from live ticks, or None if a strike is missing
+        
+        Only the analysis window (ATM±ANALYSIS_STRIKE_WINDOW) must be fresh;
+        thinly traded far strikes carry their last tick (or REST seed) forward.
+        """
+        atm = self.profile.atm_strike(spot_price)
+        min_strike, max_strike = self.profile.strike_range(atm, CHAIN_STRIKE_WINDOW)
+        fresh_min, fresh_max = self.profile.strike_range(atm, ANALYSIS_STRIKE_WINDOW)
+        state = self.feed.state
+        
+        strike_data = {}
+        for strike, (ce_key, pe_key) in self.option_keys.items():
+            if strike < min_strike or strike > max_strike:
+                continue
+            if fresh_min <= strike <= fresh_max:
+                ce, pe = state.get(ce_key), state.get(pe_key)
+            else:
+                ce, pe = state.ticks.get(ce_key), state.ticks.get(pe_key)
+            if ce is None or pe is None:
+                return None
+            strike_data[strike] = {
+                'ce_oi': ce.oi, 'pe_oi': pe.oi,
+                'ce_vol': ce.volume, 'pe_vol': pe.volume,
+                'ce_ltp': ce.ltp, 'pe_ltp': pe.ltp
+            }
+        
+        if CHAIN_STRIKE_WINDOW:
+            expected = 2 * CHAIN_STRIKE_WINDOW + 1
+        else:
+            expected = len(self.option_keys)
+        if len(strike_data) < expected:
+            return None
+        return atm, ChainSnapshot.from_dict(strike_data, self.profile.strike_gap)
+    
+    async def _track_futures(self):
+        """Keep the feed on the current futures contract (rolls at expiry)"""
+        key = self.profile.futures_key()
+        if key == self.futures_key:
+            return
+        if self.futures_key is not None:
+            await self.feed.unsubscribe([self.futures_key])
+            logger.info(f"🔁 {self.profile.name} futures rolled to {key}")
+        await self.feed.subscribe([key])
+        self.futures_key = key
+    
+    async def _track_options(self, data, atm):
+        """Subscribe feed to option instruments in the strike window and
+        unsubscribe strikes that left it (ATM moved)
+        """
+        min_strike, max_strike = self.profile.strike_range(atm, CHAIN_STRIKE_WINDOW)
+        items = data.values() if isinstance(data, dict) else data
+        
+        keys = []
+        for item in items:
+            strike = item.get('strike_price')
+            if not strike or strike < min_strike or strike > max_strike:
+                continue
+            ce_key = item.get('call_options', {}).get('instrument_key')
+            pe_key = item.get('put_options', {}).get('instrument_key')
+            if ce_key and pe_key:
+                self.option_keys[strike] = (ce_key, pe_key)
+                keys += [ce_key, pe_key]
+                # Seed from REST so far strikes that never tick still have values
+                for key, side in ((ce_key, 'call_options'), (pe_key, 'put_options')):
+                    market = item[side].get('market_data') or {}
+                    if key not in self.feed.state.ticks and market:
+                        self.feed.state.update(key, market.get('ltp'), market.get('oi'),
+                                               market.get('volume'))
+        
+        stale = [s for s in self.option_keys if s < min_strike or s > max_strike]
+        dropped = [key for s in stale for key in self.option_keys.pop(s)]
+        if dropped:
+            await self.feed.unsubscribe(dropped)
+        if keys:
+            await self.feed.subscribe(keys)
     
     async def fetch_spot(self):
-        """Fetch NIFTY spot price"""
+        """Fetch index spot price"""
         try:
-            data = await self.client.get_quote(NIFTY_SPOT_KEY)
-            return float(data.get('last_price')) if data else None
+            return await self._get_spot()
         except Exception as e:
             logger.error(f"Spot fetch error: {e}")
             return None
@@ -291,20 +677,7 @@ class DataFetcher:
     async def fetch_futures(self):
         """Fetch futures candles"""
         try:
-            key = get_nifty_futures_key()
-            data = await self.client.get_candles(key, '1minute')
-            
-            if not data or 'candles' not in data:
-                return None
-            
-            candles = data['candles']
-            if not candles:
-                return None
-            
-            df = pd.DataFrame(candles, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume', 'oi'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            
-            return df
+            return await self._get_futures()
         except Exception as e:
             logger.error(f"Futures fetch error: {e}")
             return None
@@ -312,47 +685,20 @@ class DataFetcher:
     async def fetch_option_chain(self, spot_price):
         """Fetch option chain"""
         try:
-            expiry = get_next_tuesday_expiry()
-            atm = calculate_atm_strike(spot_price)
-            min_strike, max_strike = get_strike_range(atm)
-            
-            data = await self.client.get_option_chain(NIFTY_INDEX_KEY, expiry)
+            data = await self._get_raw_chain()
             
             if not data:
                 return None
             
-            strike_data = {}
-            
-            if isinstance(data, list):
-                for item in data:
-                    strike = item.get('strike_price')
-                    if not strike or strike < min_strike or strike > max_strike:
-                        continue
-                    strike_data[strike] = {
-                        'ce_oi': item.get('call_options', {}).get('open_interest', 0),
-                        'pe_oi': item.get('put_options', {}).get('open_interest', 0),
-                        'ce_vol': item.get('call_options', {}).get('volume', 0),
-                        'pe_vol': item.get('put_options', {}).get('volume', 0),
-                        'ce_ltp': item.get('call_options', {}).get('last_price', 0),
-                        'pe_ltp': item.get('put_options', {}).get('last_price', 0)
-                    }
-            
-            elif isinstance(data, dict):
-                for key, item in data.items():
-                    strike = item.get('strike_price')
-                    if not strike or strike < min_strike or strike > max_strike:
-                        continue
-                    strike_data[strike] = {
-                        'ce_oi': item.get('call_options', {}).get('open_interest', 0),
-                        'pe_oi': item.get('put_options', {}).get('open_interest', 0),
-                        'ce_vol': item.get('call_options', {}).get('volume', 0),
-                        'pe_vol': item.get('put_options', {}).get('volume', 0),
-                        'ce_ltp': item.get('call_options', {}).get('last_price', 0),
-                        'pe_ltp': item.get('put_options', {}).get('last_price', 0)
-                    }
-            
-            return atm, strike_data
+            return self.parse_option_chain(data, spot_price, self.profile)
         
         except Exception as e:
             logger.error(f"Option chain fetch error: {e}")
             return None
+    
+    @staticmethod
+    def parse_option_chain(data, spot_price, profile=NIFTY):
+        """Filter raw chain response to the ATM strike window"""
+        atm = profile.atm_strike(spot_price)
+        min_strike, max_strike = profile.strike_range(atm, CHAIN_STRIKE_WINDOW)
+        return atm, chain_parser.parse_option_chain(data, min_strike, max_strike, profile.strike_gap)
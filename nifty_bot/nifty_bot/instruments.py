@@ -0,0 +1,100 @@
+"""
+Instruments: Per-index profiles (keys, strike gap, lot size, expiry rules)
+Everything a pipeline needs to know about the index it trades
+"""
+
+import calendar
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from config import (NIFTY_SPOT_KEY, NIFTY_INDEX_KEY, STRIKE_GAP, LOT_SIZE,
+                    VWAP_BUFFER, MIN_CANDLE_SIZE, ATR_FALLBACK)
+from clock import get_clock
+
+
+@dataclass(frozen=True)
+class InstrumentProfile:
+    """Static description of one index"""
+    name: str
+    spot_key: str
+    index_key: str
+    strike_gap: int
+    lot_size: int
+    futures_exchange: str = 'NSE_FO'
+    expiry_weekday: int = 1  # Monday=0
+    monthly_expiry: bool = False  # last `expiry_weekday` of the month
+    point_scale: float = 1.0  # index level relative to NIFTY, scales point thresholds
+
+    @property
+    def namespace(self):
+        """Redis/log namespace"""
+        return self.name.lower()
+
+    # ---------- point thresholds (config values are NIFTY points) ----------
+    @property
+    def vwap_buffer(self):
+        return VWAP_BUFFER * self.point_scale
+
+    @property
+    def min_candle_size(self):
+        return MIN_CANDLE_SIZE * self.point_scale
+
+    @property
+    def atr_fallback(self):
+        return ATR_FALLBACK * self.point_scale
+
+    def next_expiry(self):
+        """Next option expiry as 'YYYY-MM-DD' (today's expiry rolls to the next one)"""
+        today = get_clock().now().date()
+        if self.monthly_expiry:
+            expiry = self._monthly(today.year, today.month)
+            if expiry <= today:
+                year, month = (today.year + 1, 1) if today.month == 12 else (today.year, today.month + 1)
+                expiry = self._monthly(year, month)
+        else:
+            days_ahead = self.expiry_weekday - today.weekday()
+            if days_ahead <= 0:
+                days_ahead += 7
+            expiry = today + timedelta(days=days_ahead)
+        return expiry.strftime('%Y-%m-%d')
+
+    def _monthly(self, year, month):
+        last = datetime(year, month, calendar.monthrange(year, month)[1]).date()
+        return last - timedelta(days=(last.weekday() - self.expiry_weekday) % 7)
+
+    def futures_key(self):
+        """Current-month futures instrument key"""
+        expiry = datetime.strptime(self.next_expiry(), '%Y-%m-%d')
+        return f"{self.futures_exchange}|{self.name}{expiry:%y}{expiry:%b}FUT".upper()
+
+    def atm_strike(self, spot_price):
+        return round(spot_price / self.strike_gap) * self.strike_gap
+
+    def strike_range(self, atm_strike, num_strikes=2):
+        """Min/max strike for ATM±num_strikes (0 -> full chain)"""
+        if not num_strikes:
+            return float('-inf'), float('inf')
+        return (atm_strike - num_strikes * self.strike_gap,
+                atm_strike + num_strikes * self.strike_gap)
+
+
+NIFTY = InstrumentProfile('NIFTY', NIFTY_SPOT_KEY, NIFTY_INDEX_KEY, STRIKE_GAP, LOT_SIZE)
+
+PROFILES = {
+    'NIFTY': NIFTY,
+    'BANKNIFTY': InstrumentProfile('BANKNIFTY', 'NSE_INDEX|Nifty Bank', 'NSE_INDEX|Nifty Bank',
+                                   strike_gap=100, lot_size=35, monthly_expiry=True, point_scale=2.2),
+    'FINNIFTY': InstrumentProfile('FINNIFTY', 'NSE_INDEX|Nifty Fin Service', 'NSE_INDEX|Nifty Fin Service',
+                                  strike_gap=50, lot_size=65, monthly_expiry=True),
+    'SENSEX': InstrumentProfile('SENSEX', 'BSE_INDEX|SENSEX', 'BSE_INDEX|SENSEX',
+                                strike_gap=100, lot_size=20, futures_exchange='BSE_FO', expiry_weekday=3,
+                                point_scale=3.3),
+}
+
+
+def get_profile(name):
+    """Profile by index name (case-insensitive)"""
+    try:
+        return PROFILES[name.strip().upper()]
+    except KeyError:
+        raise ValueError(f"Unknown index '{name}'. Known: {', '.join(PROFILES)}")
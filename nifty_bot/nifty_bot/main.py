@@ -10,16 +10,23 @@ Complete autonomous trading signal generator with exit alerts
 """
 
 import asyncio
-from datetime import datetime
+import time as time_module
 
 # Import all modules
 from config import *
 from utils import *
 from data_manager import UpstoxClient, RedisBrain, DataFetcher
-from analyzers import OIAnalyzer, VolumeAnalyzer, TechnicalAnalyzer, MarketAnalyzer
+from market_feed import MarketFeedClient
+from recorder import SessionRecorder, RecordingClient
+from clock import CycleSchedule
+from instruments import NIFTY, get_profile
+from analyzers import OIAnalyzer, VolumeAnalyzer, TechnicalAnalyzer, MarketAnalyzer, IndicatorEngine
 from signal_engine import SignalGenerator, SignalValidator
 from position_tracker import PositionTracker
-from alerts import TelegramBot, MessageFormatter
+from alerts import TelegramBot, MessageFormatter, AlertDispatcher
+from profiling import Profiler
+from metrics import (CycleTimer, MetricsServer, CYCLE_SECONDS, CYCLE_LATENESS, SLOTS_SKIPPED,
+                     FETCH_ERRORS)
 
 BOT_VERSION = "3.0.0"
 
@@ -28,87 +35,51 @@ logger = setup_logger("main")
 
 # ==================== Main Bot ====================
 class NiftyTradingBot:
-    """Main bot orchestrator"""
+    """Analysis pipeline for one index (NIFTY by default)"""
     
-    def __init__(self):
-        # Core components
-        self.memory = RedisBrain()
+    def __init__(self, profile=NIFTY, memory=None, telegram=None, alerts=None):
+        self.profile = profile
+        
+        # Core components (client/feed are attached by IndexScheduler)
+        self.memory = memory or RedisBrain(profile.namespace)
         self.upstox = None
         self.data_fetcher = None
+        self.feed = None
         
         # Analyzers
         self.oi_analyzer = OIAnalyzer()
         self.volume_analyzer = VolumeAnalyzer()
         self.technical_analyzer = TechnicalAnalyzer()
         self.market_analyzer = MarketAnalyzer()
+        self.indicators = IndicatorEngine(fallback=profile.atr_fallback)
         
         # Signal & Position
-        self.signal_gen = SignalGenerator()
+        self.signal_gen = SignalGenerator(profile)
         self.signal_validator = SignalValidator()
         self.position_tracker = PositionTracker()
         
         # Alerts
-        self.telegram = TelegramBot()
+        self.telegram = telegram or TelegramBot()
+        self.alerts = alerts or AlertDispatcher(self.telegram)
         self.formatter = MessageFormatter()
-        
-        # State
-        self.running = False
     
-    async def initialize(self):
-        """Initialize bot"""
-        logger.info("=" * 60)
-        logger.info(f"🚀 NIFTY Trading Bot v{BOT_VERSION}")
-        logger.info("=" * 60)
-        
-        self.upstox = UpstoxClient()
-        await self.upstox.__aenter__()
-        
-        self.data_fetcher = DataFetcher(self.upstox)
-        
-        if self.telegram.is_enabled():
-            await self.telegram.send(f"🚀 Bot v{BOT_VERSION} Started")
-        
-        logger.info("✅ Bot initialized")
-        logger.info(f"📅 Next Expiry: {get_next_tuesday_expiry()}")
-        logger.info("=" * 60)
-    
-    async def shutdown(self):
-        """Shutdown bot"""
-        logger.info("🛑 Shutting down...")
-        self.running = False
-        
-        if self.upstox:
-            await self.upstox.__aexit__(None, None, None)
-        
-        logger.info("✅ Shutdown complete")
+    def attach(self, upstox, feed=None):
+        """Use a (shared) API client and market feed"""
+        self.upstox = upstox
+        self.feed = feed
+        self.data_fetcher = DataFetcher(upstox, feed=feed, profile=self.profile)
     
     async def run(self):
-        """Main loop"""
-        self.running = True
-        
-        try:
-            await self.initialize()
-            
-            while self.running:
-                try:
-                    await self._cycle()
-                except Exception as e:
-                    logger.error(f"❌ Cycle error: {e}", exc_info=True)
-                
-                await asyncio.sleep(SCAN_INTERVAL)
-        
-        except KeyboardInterrupt:
-            logger.info("⚠️ Keyboard interrupt")
-        finally:
-            await self.shutdown()
+        """Run this pipeline on its own"""
+        await IndexScheduler([self]).run()
     
-    async def _cycle(self):
-        """Single scan cycle"""
+    async def _cycle(self, slot=None):
+        """Single scan cycle (`slot`: scheduled start, enables the candle rollover check)"""
         now = get_ist_time()
         status, _ = get_market_status()
         
         logger.info(f"\n{'='*60}")
-        logger.info(f"⏰ {format_time_ist(now)} | {status}")
+        logger.info(f"⏰ {self.profile.name} {format_time_ist(now)} | {status}")
         logger.info(f"{'='*60}")
         
         # Market closed
@@ -120,63 +91,77 @@ class NiftyTradingBot:
             await self.memory.load_previous_day_data()
             return
         
-        # Fetch data
-        spot = await self.data_fetcher.fetch_spot()
-        if not validate_price(spot):
-            return
+        timer = CycleTimer(self.profile.name)
+        
+        # Fetch data (spot, futures and chain concurrently)
+        fetched = await self.data_fetcher.fetch_all()
+        timer.lap('fetch')
+        for name, error in fetched.errors.items():
+            FETCH_ERRORS.inc(self.profile.name, name)
+            logger.warning(f"⚠️ Fetch {name} failed: {error}")
         
-        futures_df = await self.data_fetcher.fetch_futures()
-        if not validate_candle_data(futures_df):
+        spot = fetched.spot
+        if not validate_price(spot):
             return
         
-        option_result = await self.data_fetcher.fetch_option_chain(spot)
-        if not option_result:
+        candles = fetched.candles
+        if slot is not None and candles is not None:
+            candles, rolled = await self.data_fetcher.refresh_candles(candles, slot)
+            if not rolled:
+                logger.warning(f"⚠️ {self.profile.name} candles not rolled over for {slot:%H:%M}")
+            timer.lap('candles')
+        if not validate_candle_data(candles):
             return
         
-        atm, strike_data = option_result
+        atm, strike_data = fetched.atm, fetched.strike_data
         if not validate_strike_data(strike_data):
             return
         
-        futures_price = futures_df['close'].iloc[-1]
+        futures_price = fetched.futures or float(candles['close'][-1])
         
-        logger.info(f"✅ Data: Spot={spot:.2f}, Futures={futures_price:.2f}, ATM={atm}")
+        logger.info(f"✅ {self.profile.name} Data: Spot={spot:.2f}, Futures={futures_price:.2f}, ATM={atm} ({fetched.elapsed:.2f}s)")
         
         # Save OI
-        total_ce, total_pe = self.oi_analyzer.calculate_total_oi(strike_data)
-        self.memory.save_total_oi(total_ce, total_pe)
-        
-        for strike, data in strike_data.items():
-            self.memory.save_strike(strike, data)
-        
-        # Get OI changes
-        ce_5m, pe_5m, has_5m = self.memory.get_total_oi_change(total_ce, total_pe, 5)
-        ce_15m, pe_15m, has_15m = self.memory.get_total_oi_change(total_ce, total_pe, 15)
+        total_ce, total_pe = self.oi_analyzer.calculate_total_oi(strike_data, atm, ANALYSIS_STRIKE_WINDOW,
+                                                                 self.profile.strike_gap)
+        await self.memory.save_snapshot(total_ce, total_pe, strike_data)
         
+        # Get OI changes (one round trip for all windows)
         atm_data = self.oi_analyzer.get_atm_data(strike_data, atm)
-        atm_ce_5m, atm_pe_5m, has_atm_5m = self.memory.get_strike_oi_change(atm, atm_data, 5)
-        atm_ce_15m, atm_pe_15m, has_atm_15m = self.memory.get_strike_oi_change(atm, atm_data, 15)
+        changes = await self.memory.get_changes(total_ce, total_pe, {atm: atm_data},
+                                                strikes=[atm], windows=(5, 15))
+        ce_5m, pe_5m, has_5m = changes['total'][5]
+        ce_15m, pe_15m, has_15m = changes['total'][15]
+        atm_ce_5m, atm_pe_5m, has_atm_5m = changes[atm][5]
+        atm_ce_15m, atm_pe_15m, has_atm_15m = changes[atm][15]
+        timer.lap('redis')
         
         # Analysis
         pcr = self.oi_analyzer.calculate_pcr(total_pe, total_ce)
-        vwap = self.technical_analyzer.calculate_vwap(futures_df)
-        atr = self.technical_analyzer.calculate_atr(futures_df)
+        self.indicators.update(candles)
+        vwap = self.indicators.vwap
+        atr = self.indicators.atr
         vwap_dist = self.technical_analyzer.calculate_vwap_distance(futures_price, vwap) if vwap else 0
-        candle = self.technical_analyzer.analyze_candle(futures_df)
-        momentum = self.technical_analyzer.detect_momentum(futures_df)
+        candle = self.technical_analyzer.analyze_candle(candles)
+        momentum = self.technical_analyzer.detect_momentum(candles)
         
-        vol_trend = self.volume_analyzer.analyze_volume_trend(futures_df)
+        vol_trend = self.volume_analyzer.analyze_volume_trend(candles)
         vol_spike, vol_ratio = self.volume_analyzer.detect_volume_spike(
             vol_trend['current_volume'], vol_trend['avg_volume']
         )
-        order_flow = self.volume_analyzer.calculate_order_flow(strike_data)
+        order_flow = self.volume_analyzer.calculate_order_flow(strike_data, atm, ANALYSIS_STRIKE_WINDOW,
+                                                                 self.profile.strike_gap)
         
-        gamma = self.market_analyzer.detect_gamma_zone()
+        max_pain, _ = self.market_analyzer.calculate_max_pain(strike_data)
+        gamma = self.market_analyzer.detect_gamma_zone(self.profile.next_expiry())
         unwinding = self.oi_analyzer.detect_unwinding(ce_5m, ce_15m, pe_5m, pe_15m)
+        timer.lap('analysis')
         
         # Log analysis
         logger.info(f"\n📊 Analysis: PCR={pcr}, VWAP={vwap:.2f}, ATR={atr:.1f}")
         logger.info(f"   OI: 5m CE={ce_5m:+.1f}% PE={pe_5m:+.1f}% | 15m CE={ce_15m:+.1f}% PE={pe_15m:+.1f}%")
         logger.info(f"   Vol: {vol_ratio:.1f}x {'SPIKE' if vol_spike else ''}, Flow={order_flow:.2f}")
+        logger.info(f"   Max Pain: {max_pain} ({spot - max_pain:+.0f} from spot)")
         
         # Check warmup
         stats = self.memory.get_stats()
@@ -184,15 +169,56 @@ class NiftyTradingBot:
             logger.info(f"\n⏳ WARMUP: {stats['elapsed_minutes']:.1f}/{WARMUP_MINUTES} min")
             return  # BLOCK SIGNALS
         
-        # Check exit conditions if position active
+        inputs = dict(
+            spot_price=spot, futures_price=futures_price, vwap=vwap,
+            vwap_distance=vwap_dist, pcr=pcr, atr=atr, atm_strike=atm,
+            atm_data=atm_data, ce_total_5m=ce_5m, pe_total_5m=pe_5m,
+            ce_total_15m=ce_15m, pe_total_15m=pe_15m,
+            atm_ce_5m=atm_ce_5m, atm_pe_5m=atm_pe_5m,
+            atm_ce_15m=atm_ce_15m, atm_pe_15m=atm_pe_15m,
+            has_5m_total=has_5m, has_15m_total=has_15m,
+            has_5m_atm=has_atm_5m, has_15m_atm=has_atm_15m,
+            volume_spike=vol_spike, volume_ratio=vol_ratio,
+            order_flow=order_flow, candle_data=candle,
+            gamma_zone=gamma, momentum=momentum,
+            multi_tf=unwinding['multi_timeframe']
+        )
+        signal_time = is_signal_time()
+        exited, opened = self._step_position(inputs, signal_time)
+        timer.lap('signal')
+        
+        if exited:
+            position, reason, details = exited
+            if self.telegram.is_enabled():
+                msg = self.formatter.format_exit_signal(position, reason, details)
+                self.alerts.send_exit(f"<b>{self.profile.name}</b>\n{msg}")
+            logger.info(f"🚪 {self.profile.name} EXIT: {reason} - {details}")
+        
+        if opened:
+            logger.info(f"\n🔔 {self.profile.name} SIGNAL: {opened.signal_type.value} @ ₹{opened.entry_price:.2f}")
+            if self.telegram.is_enabled():
+                msg = self.formatter.format_entry_signal(opened)
+                self.alerts.send_signal(f"<b>{self.profile.name}</b>\n{msg}")
+        elif signal_time and not self.position_tracker.has_active_position():
+            logger.info("\n✋ No setup")
+        timer.lap('alerts')
+    
+    def _step_position(self, inputs, signal_time):
+        """Exit check for the open position, then entry check; no I/O
+        
+        `inputs` are the SignalGenerator.generate kwargs for this cycle.
+        Returns (exited, opened): (closed position, reason, details) or None,
+        and the validated new Signal or None.
+        """
+        exited = None
         if self.position_tracker.has_active_position():
             current_data = {
-                'ce_oi_5m': ce_5m,
-                'pe_oi_5m': pe_5m,
-                'volume_ratio': vol_ratio,
-                'candle_data': candle,
-                'futures_price': futures_price,
-                'atm_data': atm_data
+                'ce_oi_5m': inputs['ce_total_5m'],
+                'pe_oi_5m': inputs['pe_total_5m'],
+                'volume_ratio': inputs['volume_ratio'],
+                'candle_data': inputs['candle_data'],
+                'futures_price': inputs['futures_price'],
+                'atm_data': inputs['atm_data']
             }
             
             exit_check = self.position_tracker.check_exit_conditions(current_data)
@@ -205,58 +231,174 @@ class NiftyTradingBot:
                     self.position_tracker.active_position.signal)
                 
                 self.position_tracker.close_position(reason, details, exit_premium)
-                
-                # Send exit alert
-                if self.telegram.is_enabled():
-                    msg = self.formatter.format_exit_signal(
-                        self.position_tracker.closed_positions[-1],
-                        reason, details
-                    )
-                    await self.telegram.send_exit(msg)
-                
-                logger.info(f"🚪 EXIT: {reason} - {details}")
+                exited = (self.position_tracker.closed_positions[-1], reason, details)
         
         # Generate entry signal if no position
-        if not self.position_tracker.has_active_position() and is_signal_time():
-            signal = self.signal_gen.generate(
-                spot_price=spot, futures_price=futures_price, vwap=vwap,
-                vwap_distance=vwap_dist, pcr=pcr, atr=atr, atm_strike=atm,
-                atm_data=atm_data, ce_total_5m=ce_5m, pe_total_5m=pe_5m,
-                ce_total_15m=ce_15m, pe_total_15m=pe_15m,
-                atm_ce_5m=atm_ce_5m, atm_pe_5m=atm_pe_5m,
-                atm_ce_15m=atm_ce_15m, atm_pe_15m=atm_pe_15m,
-                has_5m_total=has_5m, has_15m_total=has_15m,
-                has_5m_atm=has_atm_5m, has_15m_atm=has_atm_15m,
-                volume_spike=vol_spike, volume_ratio=vol_ratio,
-                order_flow=order_flow, candle_data=candle,
-                gamma_zone=gamma, momentum=momentum,
-                multi_tf=unwinding['multi_timeframe']
-            )
-            
-            validated = self.signal_validator.validate(signal)
+        opened = None
+        if not self.position_tracker.has_active_position() and signal_time:
+            signal = self.signal_gen.generate(**inputs)
+            opened = self.signal_validator.validate(signal)
+            if opened:
+                self.position_tracker.open_position(opened)
+        
+        return exited, opened
+
+
+# ==================== Index Scheduler ====================
+class IndexScheduler:
+    """Runs one pipeline per index concurrently in a single event loop
+    
+    All pipelines share one UpstoxClient (so one session and one rate
+    budget), one market feed and one Redis connection; each pipeline's
+    RedisBrain is a namespaced child of the first one.
+    """
+    
+    def __init__(self, pipelines):
+        self.pipelines = pipelines
+        self.memory = pipelines[0].memory.root
+        self.telegram = pipelines[0].telegram
+        self.alerts = pipelines[0].alerts
+        self.upstox = None
+        self.feed = None
+        self.recorder = None
+        self.metrics = None
+        self.profiler = Profiler()
+        self.running = False
+    
+    @classmethod
+    def for_indices(cls, names):
+        """Scheduler with a pipeline per index name, sharing Redis and Telegram"""
+        profiles = [get_profile(name) for name in names]
+        memory = RedisBrain(profiles[0].namespace)
+        telegram = TelegramBot()
+        alerts = AlertDispatcher(telegram)
+        pipelines = [
+            NiftyTradingBot(profile, memory=memory if i == 0 else memory.child(profile.namespace),
+                            telegram=telegram, alerts=alerts)
+            for i, profile in enumerate(profiles)
+        ]
+        return cls(pipelines)
+    
+    @property
+    def names(self):
+        return ', '.join(p.profile.name for p in self.pipelines)
+    
+    async def initialize(self):
+        """Initialize shared resources and attach them to every pipeline"""
+        logger.info("=" * 60)
+        logger.info(f"🚀 NIFTY Trading Bot v{BOT_VERSION} | {self.names}")
+        logger.info("=" * 60)
+        
+        await self.memory.connect()
+        
+        if METRICS_PORT:
+            self.metrics = MetricsServer(METRICS_HOST, METRICS_PORT)
+            await self.metrics.start()
+        
+        if RECORD_DIR:
+            self.recorder = SessionRecorder(RECORD_DIR, '_'.join(p.profile.namespace for p in self.pipelines))
+            self.upstox = RecordingClient(self.recorder)
+        else:
+            self.upstox = UpstoxClient()
+        await self.upstox.__aenter__()
+        await self.upstox.prewarm()
+        
+        if MARKET_FEED_ENABLED:
+            try:
+                self.feed = MarketFeedClient(upstox=self.upstox)
+            except RuntimeError as e:
+                logger.error(f"❌ Market feed disabled, polling REST: {e}")
+        if self.feed:
+            for pipeline in self.pipelines:
+                await self.feed.subscribe([pipeline.profile.spot_key])
+            self.feed.start()
+            logger.info("📡 Market feed mode enabled")
+        
+        for pipeline in self.pipelines:
+            pipeline.attach(self.upstox, self.feed)
+        
+        self.profiler.install()
+        
+        self.alerts.start()
+        self.alerts.send(f"🚀 Bot v{BOT_VERSION} Started ({self.names})")
+        
+        logger.info("✅ Bot initialized")
+        for pipeline in self.pipelines:
+            logger.info(f"📅 {pipeline.profile.name} Next Expiry: {pipeline.profile.next_expiry()}")
+        logger.info("=" * 60)
+    
+    async def shutdown(self):
+        """Shutdown bot"""
+        logger.info("🛑 Shutting down...")
+        self.running = False
+        
+        self.profiler.uninstall()
+        await self.alerts.close()
+        
+        if self.feed:
+            await self.feed.stop()
+        
+        if self.upstox:
+            await self.upstox.__aexit__(None, None, None)
+        
+        await self.memory.close()
+        
+        if self.metrics:
+            await self.metrics.stop()
+        
+        if self.recorder:
+            self.recorder.close()
+        
+        logger.info("✅ Shutdown complete")
+    
+    async def _run_cycle(self, pipeline, slot=None):
+        start = time_module.perf_counter()
+        try:
+            await pipeline._cycle(slot)
+        except Exception as e:
+            logger.error(f"❌ {pipeline.profile.name} cycle error: {e}", exc_info=True)
+        CYCLE_SECONDS.observe(time_module.perf_counter() - start, pipeline.profile.name)
+    
+    async def run(self):
+        """Main loop"""
+        self.running = True
+        
+        try:
+            await self.initialize()
+            schedule = CycleSchedule(SCAN_INTERVAL, CYCLE_OFFSET_SECONDS, CYCLE_MAX_LATE_SECONDS)
             
-            if validated:
-                logger.info(f"\n🔔 SIGNAL: {validated.signal_type.value} @ ₹{validated.entry_price:.2f}")
+            while self.running:
+                slot, late = await schedule.wait()
+                CYCLE_LATENESS.observe(late)
+                if schedule.missed:
+                    SLOTS_SKIPPED.inc(amount=schedule.missed)
+                    logger.warning(f"⚠️ Skipped {schedule.missed} slot(s) before {slot:%H:%M:%S}")
+                logger.info(f"⏱️ Slot {slot:%H:%M:%S} started {late:.2f}s late")
                 
-                # Open position
-                self.position_tracker.open_position(validated)
+                # Keep the pool hot until the first fetching cycle at PREMARKET_END
+                if is_premarket():
+                    await self.upstox.prewarm()
                 
-                # Send alert
-                if self.telegram.is_enabled():
-                    msg = self.formatter.format_entry_signal(validated)
-                    await self.telegram.send_signal(msg)
-            else:
-                logger.info("\n✋ No setup")
+                if self.recorder:
+                    self.recorder.begin_cycle(get_ist_time())
+                try:
+                    with self.profiler.cycle(slot):
+                        await asyncio.gather(*(self._run_cycle(p, slot) for p in self.pipelines))
+                finally:
+                    if self.recorder:
+                        self.recorder.end_cycle()
+        
+        except KeyboardInterrupt:
+            logger.info("⚠️ Keyboard interrupt")
+        finally:
+            await self.shutdown()
 
 
 # ==================== Entry Point ====================
 async def main():
-    bot = NiftyTradingBot()
-    await bot.run()
+    scheduler = IndexScheduler.for_indices(INDICES)
+    await scheduler.run()
 
 
 if __name__ == "__main__":
     asyncio.run(main())
-
-
-"""
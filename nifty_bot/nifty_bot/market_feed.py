@@ -0,0 +1,300 @@
+"""
+Market Feed: WebSocket live-tick client + in-memory feed state
+Streams LTP/OI/volume instead of polling REST every cycle
+"""
+
+import asyncio
+import json
+import uuid
+from dataclasses import dataclass
+
+import aiohttp
+from aiohttp import web
+
+try:
+    # Generated from Upstox's MarketDataFeedV3.proto; ships with upstox-python-sdk
+    from upstox_client.feeder.proto import MarketDataFeedV3_pb2 as feed_pb2
+    PROTOBUF_AVAILABLE = True
+except ImportError:
+    try:
+        import MarketDataFeedV3_pb2 as feed_pb2  # compiled locally with protoc
+        PROTOBUF_AVAILABLE = True
+    except ImportError:
+        PROTOBUF_AVAILABLE = False
+
+from config import *
+from utils import setup_logger
+
+logger = setup_logger("market_feed")
+
+
+# ==================== Feed State ====================
+@dataclass
+class Tick:
+    """Latest live values for one instrument"""
+    ltp: float = 0.0
+    oi: float = 0.0
+    volume: float = 0.0
+    updated_at: float = 0.0
+
+
+class FeedState:
+    """In-memory LTP/OI/volume per instrument key"""
+
+    def __init__(self):
+        self.ticks = {}
+
+    def update(self, key, ltp=None, oi=None, volume=None):
+        """Apply a (possibly partial) tick"""
+        tick = self.ticks.get(key)
+        if tick is None:
+            tick = self.ticks[key] = Tick()
+        if ltp is not None:
+            tick.ltp = float(ltp)
+        if oi is not None:
+            tick.oi = float(oi)
+        if volume is not None:
+            tick.volume = float(volume)
+        tick.updated_at = asyncio.get_event_loop().time()
+
+    def get(self, key, max_age=FEED_STALE_SECONDS):
+        """Get tick if seen within max_age seconds"""
+        tick = self.ticks.get(key)
+        if tick is None:
+            return None
+        if asyncio.get_event_loop().time() - tick.updated_at > max_age:
+            return None
+        return tick
+
+
+# ==================== Upstox Protobuf ====================
+def decode_upstox_feed(raw):
+    """Upstox v3 FeedResponse frame -> {"feeds": {key: {"ltp", "oi", "volume"}}}"""
+    response = feed_pb2.FeedResponse()
+    response.ParseFromString(raw)
+
+    feeds = {}
+    for key, feed in response.feeds.items():
+        if feed.HasField('ltpc'):
+            feeds[key] = {'ltp': feed.ltpc.ltp}
+        elif feed.HasField('fullFeed'):
+            full = feed.fullFeed
+            if full.HasField('indexFF'):
+                feeds[key] = {'ltp': full.indexFF.ltpc.ltp}
+            else:
+                market = full.marketFF
+                feeds[key] = {'ltp': market.ltpc.ltp, 'oi': market.oi, 'volume': market.vtt}
+        elif feed.HasField('firstLevelWithGreeks'):
+            first = feed.firstLevelWithGreeks
+            feeds[key] = {'ltp': first.ltpc.ltp, 'oi': first.oi, 'volume': first.vtt}
+    return {'feeds': feeds}
+
+
+# ==================== Feed Client ====================
+class MarketFeedClient:
+    """WebSocket market feed with reconnect-and-resubscribe
+
+    Messages are decoded into
+    {"feeds": {instrument_key: {"ltp": .., "oi": .., "volume": ..}}}.
+    With MARKET_FEED_URL (or `url`) set the feed speaks JSON, as
+    FakeFeedServer does; otherwise it is the authorized Upstox v3 feed,
+    which takes binary requests and sends protobuf frames. That needs the
+    generated MarketDataFeedV3_pb2 module, and construction fails without
+    it rather than dropping every tick.
+    """
+
+    def __init__(self, url=None, upstox=None, state=None, decoder=None):
+        self.url = url or MARKET_FEED_URL
+        self.upstox = upstox
+        self.state = state or FeedState()
+        self.binary_requests = not self.url
+        if decoder is None:
+            if self.url:
+                decoder = json.loads
+            elif PROTOBUF_AVAILABLE:
+                decoder = decode_upstox_feed
+            else:
+                raise RuntimeError("Upstox market feed sends protobuf: install upstox-python-sdk "
+                                   "(MarketDataFeedV3_pb2) or set MARKET_FEED_URL to a JSON feed")
+        self.decoder = decoder
+        self.keys = set()
+        self.connected = asyncio.Event()
+        self.reconnects = 0
+        self._ws = None
+        self._session = None
+        self._task = None
+        self._running = False
+
+    def start(self):
+        """Run the feed in a background task"""
+        if self._task is None:
+            self._running = True
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def stop(self):
+        """Stop feed and close connection"""
+        self._running = False
+        if self._ws is not None:
+            await self._ws.close()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def subscribe(self, keys):
+        """Track keys; sent now if connected, else on (re)connect"""
+        new = set(keys) - self.keys
+        if not new:
+            return
+        self.keys |= new
+        if self._ws is not None and not self._ws.closed:
+            await self._send('sub', new)
+
+    async def unsubscribe(self, keys):
+        """Stop tracking keys and forget their ticks"""
+        gone = set(keys) & self.keys
+        if not gone:
+            return
+        self.keys -= gone
+        for key in gone:
+            self.state.ticks.pop(key, None)
+        if self._ws is not None and not self._ws.closed:
+            await self._send('unsub', gone)
+
+    async def _send(self, method, keys):
+        request = {'guid': uuid.uuid4().hex, 'method': method,
+                   'data': {'instrumentKeys': sorted(keys)}}
+        if method == 'sub':
+            request['data']['mode'] = 'full'
+        payload = json.dumps(request)
+        if self.binary_requests:
+            await self._ws.send_bytes(payload.encode())
+        else:
+            await self._ws.send_str(payload)
+
+    async def _resolve_url(self):
+        """Use configured URL or ask Upstox for an authorized one"""
+        if self.url:
+            return self.url
+        data = await self.upstox._request(UPSTOX_FEED_AUTHORIZE_URL)
+        return data['data']['authorized_redirect_uri']
+
+    async def run(self):
+        """Connect, resubscribe and consume until stopped"""
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+
+        delay = 1
+        while self._running:
+            try:
+                url = await self._resolve_url()
+                async with self._session.ws_connect(url, heartbeat=FEED_HEARTBEAT_SECONDS) as ws:
+                    self._ws = ws
+                    if self.keys:
+                        await self._send('sub', self.keys)
+                    self.connected.set()
+                    logger.info(f"✅ Market feed connected ({len(self.keys)} keys)")
+                    delay = 1
+
+                    async for msg in ws:
+                        if msg.type in (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY):
+                            self._on_message(msg.data)
+                        elif msg.type == aiohttp.WSMsgType.ERROR:
+                            break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ Market feed error: {e}")
+            finally:
+                self._ws = None
+                self.connected.clear()
+
+            if not self._running:
+                break
+
+            self.reconnects += 1
+            logger.warning(f"⚠️ Market feed disconnected, retrying in {delay}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, FEED_RECONNECT_MAX_DELAY)
+
+    def _on_message(self, raw):
+        try:
+            msg = self.decoder(raw)
+        except Exception as e:
+            logger.error(f"Feed decode error: {e}")
+            return
+
+        for key, feed in (msg.get('feeds') or {}).items():
+            self.state.update(key, feed.get('ltp'), feed.get('oi'), feed.get('volume'))
+
+
+# ==================== Local Feed Server ====================
+class FakeFeedServer:
+    """Local stand-in feed for offline runs
+
+    Speaks the same JSON protocol as MarketFeedClient. `publish()` pushes
+    ticks to every connection subscribed to the key and
+    `drop_connections()` simulates a server-side disconnect.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0):
+        self.host = host
+        self.port = port
+        self.subscriptions = {}
+        self._runner = None
+        self._app = web.Application()
+        self._app.router.add_get('/feed', self._handle)
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}/feed"
+
+    async def start(self):
+        self._runner = web.AppRunner(self._app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        await self.drop_connections()
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def _handle(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.subscriptions[ws] = set()
+        try:
+            async for msg in ws:
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    continue
+                req = json.loads(msg.data)
+                keys = set(req.get('data', {}).get('instrumentKeys', []))
+                if req.get('method') == 'sub':
+                    self.subscriptions[ws] |= keys
+                elif req.get('method') == 'unsub':
+                    self.subscriptions[ws] -= keys
+        finally:
+            self.subscriptions.pop(ws, None)
+        return ws
+
+    async def publish(self, key, ltp=None, oi=None, volume=None):
+        """Send one tick to subscribers of key"""
+        feed = {k: v for k, v in (('ltp', ltp), ('oi', oi), ('volume', volume)) if v is not None}
+        payload = json.dumps({'type': 'live_feed', 'feeds': {key: feed}})
+        for ws, keys in list(self.subscriptions.items()):
+            if key in keys and not ws.closed:
+                await ws.send_str(payload)
+
+    async def drop_connections(self):
+        for ws in list(self.subscriptions):
+            await ws.close()
@@ -0,0 +1,159 @@
+"""
+Metrics: Counters/histograms for cycle stages, API calls and Redis
+Prometheus text format on a local /metrics endpoint in the bot's event loop
+"""
+
+import bisect
+import time as time_module
+
+from aiohttp import web
+
+from config import METRICS_HOST, METRICS_PORT
+from utils import setup_logger
+
+logger = setup_logger("metrics")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+REGISTRY = []
+
+
+# ==================== Metric Types ====================
+class Counter:
+    """Monotonic count per label tuple"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values = {}
+        REGISTRY.append(self)
+
+    def inc(self, *label_values, amount=1):
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def samples(self):
+        for label_values, value in self.values.items():
+            yield self.name, _labels(self.labels, label_values), value
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label tuple
+
+    observe() is a bisect plus a few list updates, cheap enough to call
+    on every request and stage.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self.values = {}
+        REGISTRY.append(self)
+
+    def observe(self, value, *label_values):
+        series = self.values.get(label_values)
+        if series is None:
+            series = self.values[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def samples(self):
+        for label_values, (counts, total, count) in self.values.items():
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float('inf'),), counts):
+                cumulative += n
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                yield (f"{self.name}_bucket",
+                       _labels(self.labels + ('le',), label_values + (le,)), cumulative)
+            yield f"{self.name}_sum", _labels(self.labels, label_values), total
+            yield f"{self.name}_count", _labels(self.labels, label_values), count
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values):
+    if not names:
+        return ''
+    return '{' + ','.join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + '}'
+
+
+def render():
+    """All metrics in Prometheus text exposition format"""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, labels, value in metric.samples():
+            lines.append(f"{name}{labels} {value}")
+    return '\n'.join(lines) + '\n'
+
+
+# ==================== Bot Metrics ====================
+CYCLE_SECONDS = Histogram('nifty_cycle_seconds', 'Full cycle duration', ('index',))
+STAGE_SECONDS = Histogram('nifty_cycle_stage_seconds', 'Cycle duration by stage', ('index', 'stage'))
+CYCLE_LATENESS = Histogram('nifty_cycle_start_lateness_seconds', 'Cycle start after its scheduled slot',
+                           buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 30.0))
+SLOTS_SKIPPED = Counter('nifty_cycle_slots_skipped_total', 'Scheduled slots skipped as too late')
+FETCH_ERRORS = Counter('nifty_fetch_errors_total', 'Failed fetch_all calls', ('index', 'call'))
+
+HTTP_SECONDS = Histogram('upstox_request_seconds', 'Upstox request latency', ('endpoint', 'status'))
+HTTP_RETRIES = Counter('upstox_retries_total', 'Upstox request retries', ('endpoint',))
+HTTP_THROTTLED = Counter('upstox_throttled_total', 'Upstox 429 responses', ('endpoint',))
+
+REDIS_ERRORS = Counter('redis_errors_total', 'Failed Redis calls', ('error',))
+REDIS_FALLBACK = Counter('redis_fallback_total', 'Operations served from the RAM ring while Redis was down', ('op',))
+
+ALERT_SECONDS = Histogram('telegram_send_seconds', 'Telegram send latency', ('result',))
+ALERT_DROPPED = Counter('telegram_alerts_dropped_total', 'Alerts dropped', ('reason',))
+
+
+class CycleTimer:
+    """Lap timer for one cycle: lap(stage) records time since the previous lap"""
+
+    __slots__ = ('index', 'last')
+
+    def __init__(self, index):
+        self.index = index
+        self.last = time_module.perf_counter()
+
+    def lap(self, stage):
+        now = time_module.perf_counter()
+        STAGE_SECONDS.observe(now - self.last, self.index, stage)
+        self.last = now
+
+
+# ==================== HTTP Endpoint ====================
+class MetricsServer:
+    """Serves GET /metrics from the running event loop"""
+
+    def __init__(self, host=METRICS_HOST, port=METRICS_PORT):
+        self.host = host
+        self.port = port
+        self.runner = None
+
+    async def _handle(self, request):
+        return web.Response(body=render().encode(),
+                            headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'})
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get('/metrics', self._handle)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+        logger.info(f"📈 Metrics on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
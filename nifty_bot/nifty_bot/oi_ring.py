@@ -0,0 +1,157 @@
+"""
+OI Ring: Minute-indexed in-RAM OI snapshot buffer
+Numeric arrays indexed by epoch minute; no keys, no JSON
+"""
+
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from config import SESSION_MINUTES, MEMORY_TTL_SECONDS, MEMORY_MAX_STRIKES, CHAIN_STRIKE_WINDOW
+from utils import setup_logger
+
+logger = setup_logger("oi_ring")
+
+CE, PE = 0, 1
+
+
+class OIRing:
+    """Ring of per-minute total and per-strike CE/PE OI
+
+    Slot = epoch_minute % minutes. Each slot remembers which minute it
+    holds, so a lookup is index arithmetic plus a stamp check; a slot
+    reused by a later minute simply stops matching older targets.
+    
+    Slots are queued in claim order, so `expire()` only touches slots that
+    are actually past TTL. With `max_strikes` set, the strike written
+    least recently gives up its column when a new strike arrives.
+    """
+
+    def __init__(self, minutes=SESSION_MINUTES, strikes=64, ttl=MEMORY_TTL_SECONDS,
+                 max_strikes=MEMORY_MAX_STRIKES):
+        self.minutes = minutes
+        self.ttl = ttl
+        self.max_strikes = max_strikes
+        if max_strikes:
+            # Each cycle writes the whole fetched window; a smaller cap evicts
+            # strikes every minute and their change windows never fill
+            needed = 2 * CHAIN_STRIKE_WINDOW + 1
+            if not CHAIN_STRIKE_WINDOW:
+                logger.warning(f"⚠️ MEMORY_MAX_STRIKES={max_strikes} with CHAIN_STRIKE_WINDOW=0 (full chain): "
+                               f"strikes beyond the cap will churn in the RAM OI ring")
+            elif max_strikes < needed:
+                logger.warning(f"⚠️ MEMORY_MAX_STRIKES={max_strikes} is below the {needed} strikes fetched "
+                               f"per cycle (CHAIN_STRIKE_WINDOW={CHAIN_STRIKE_WINDOW}); RAM OI changes will churn")
+        self.stamps = np.full(minutes, -1, dtype=np.int64)
+        self.written_at = np.zeros(minutes, dtype=np.float64)
+        self.totals = np.zeros((minutes, 2), dtype=np.float64)
+        self.has_total = np.zeros(minutes, dtype=bool)
+        self.strike_cols = OrderedDict()
+        self.expiry_queue = deque()
+        self.evicted_strikes = 0
+        self.strike_oi = np.zeros((minutes, strikes, 2), dtype=np.float64)
+        self.has_strike = np.zeros((minutes, strikes), dtype=bool)
+
+    # ---------- writes ----------
+    def _claim(self, minute, now):
+        """Slot for minute, clearing it if it held an older minute"""
+        slot = minute % self.minutes
+        if self.stamps[slot] != minute:
+            self._clear_slot(slot)
+            self.stamps[slot] = minute
+            self.expiry_queue.append((minute, slot))
+        self.written_at[slot] = now
+        return slot
+
+    def _clear_slot(self, slot):
+        self.stamps[slot] = -1
+        self.has_total[slot] = False
+        self.has_strike[slot, :] = False
+
+    def _column(self, strike):
+        col = self.strike_cols.get(strike)
+        if col is not None:
+            self.strike_cols.move_to_end(strike)
+            return col
+
+        if self.max_strikes and len(self.strike_cols) >= self.max_strikes:
+            _, col = self.strike_cols.popitem(last=False)
+            self.has_strike[:, col] = False
+            self.evicted_strikes += 1
+        else:
+            col = len(self.strike_cols)
+            if col == self.strike_oi.shape[1]:
+                self._grow()
+        self.strike_cols[strike] = col
+        return col
+
+    def _grow(self):
+        cols = self.strike_oi.shape[1] * 2
+        oi = np.zeros((self.minutes, cols, 2), dtype=np.float64)
+        has = np.zeros((self.minutes, cols), dtype=bool)
+        oi[:, :self.strike_oi.shape[1]] = self.strike_oi
+        has[:, :self.has_strike.shape[1]] = self.has_strike
+        self.strike_oi, self.has_strike = oi, has
+
+    def put_total(self, minute, ce, pe, now):
+        slot = self._claim(minute, now)
+        self.totals[slot] = (ce, pe)
+        self.has_total[slot] = True
+
+    def put_strike(self, minute, strike, ce, pe, now):
+        slot = self._claim(minute, now)
+        col = self._column(strike)
+        self.strike_oi[slot, col] = (ce, pe)
+        self.has_strike[slot, col] = True
+
+    # ---------- reads ----------
+    def _slot(self, minute, now):
+        """Slot holding minute within TTL, else None"""
+        slot = minute % self.minutes
+        if self.stamps[slot] != minute or now - self.written_at[slot] > self.ttl:
+            return None
+        return slot
+
+    def get_total(self, minute, now):
+        """(ce, pe) for minute or None"""
+        slot = self._slot(minute, now)
+        if slot is None or not self.has_total[slot]:
+            return None
+        ce, pe = self.totals[slot]
+        return float(ce), float(pe)
+
+    def get_strike(self, minute, strike, now, tolerance=0):
+        """(ce, pe) for strike at minute, or nearest within ±tolerance minutes
+
+        Ties prefer the earlier minute (-1 before +1).
+        """
+        col = self.strike_cols.get(strike)
+        if col is None:
+            return None
+
+        for distance in range(tolerance + 1):
+            for offset in ((0,) if distance == 0 else (-distance, distance)):
+                slot = self._slot(minute + offset, now)
+                if slot is not None and self.has_strike[slot, col]:
+                    ce, pe = self.strike_oi[slot, col]
+                    return float(ce), float(pe)
+        return None
+
+    def expire(self, now):
+        """Drop slots past TTL; amortized O(1) per claimed slot"""
+        queue = self.expiry_queue
+        while queue:
+            minute, slot = queue[0]
+            if self.stamps[slot] != minute:
+                queue.popleft()  # slot already reused by a later minute
+            elif now - self.written_at[slot] > self.ttl:
+                queue.popleft()
+                self._clear_slot(slot)
+            else:
+                break
+
+    def clear(self):
+        self.stamps[:] = -1
+        self.has_total[:] = False
+        self.has_strike[:] = False
+        self.expiry_queue.clear()
@@ -12,7 +12,7 @@ from datetime import datetime
 from typing import Optional
 
 from config import *
-from utils import IST, setup_logger
+from utils import setup_logger, get_ist_time
 from signal_engine import Signal, SignalType
 
 logger = setup_logger("position_tracker")
@@ -45,7 +45,7 @@ class Position:
     
     def get_hold_time_minutes(self):
         """Get hold time in minutes"""
-        end_time = self.exit_time if self.exit_time else datetime.now(IST)
+        end_time = self.exit_time if self.exit_time else get_ist_time()
         return (end_time - self.entry_time).total_seconds() / 60
 
 
@@ -65,7 +65,7 @@ class PositionTracker:
         
         position = Position(
             signal=signal,
-            entry_time=datetime.now(IST),
+            entry_time=get_ist_time(),
             entry_premium=signal.option_premium,
             highest_premium=signal.option_premium,
             trailing_sl=signal.premium_sl if USE_PREMIUM_SL else 0
@@ -145,7 +145,7 @@ class PositionTracker:
                 return True, "Candle Rejection", "Long lower wick at support"
         
         # Exit Check 6: Time-based (Market close)
-        current_time = datetime.now(IST).time()
+        current_time = get_ist_time().time()
         if current_time >= time(15, 15):
             return True, "Market Closing", "Exiting before market close"
         
@@ -158,7 +158,7 @@ class PositionTracker:
             return
         
         self.active_position.is_active = False
-        self.active_position.exit_time = datetime.now(IST)
+        self.active_position.exit_time = get_ist_time()
         self.active_position.exit_reason = reason
         self.active_position.exit_premium = exit_premium if exit_premium > 0 else self.active_position.entry_premium
         
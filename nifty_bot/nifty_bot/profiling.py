@@ -0,0 +1,253 @@
+"""
+Profiling: On-demand cProfile / sampling captures of live cycles
+Armed by the PROFILE env flag or SIGUSR1; writes one file per cycle
+"""
+
+import asyncio
+import cProfile
+import functools
+import importlib
+import inspect
+import os
+import signal
+import sys
+import threading
+import time as time_module
+from collections import Counter
+from contextlib import contextmanager
+
+from config import (PROFILE_ENABLED, PROFILE_CYCLES, PROFILE_MODE, PROFILE_DIR,
+                    PROFILE_TARGETS, PROFILE_SAMPLE_INTERVAL)
+from utils import setup_logger
+
+logger = setup_logger("profiling")
+
+# Where PROFILE_TARGETS names ("Class.method" or "module.function") are looked up
+TARGET_MODULES = ('analyzers', 'data_manager', 'chain_parser', 'signal_engine', 'position_tracker')
+
+
+# ==================== Captures ====================
+class CProfileCapture:
+    """Deterministic profile; dumped as pstats"""
+
+    suffix = 'pstats'
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def resume(self):
+        self.profile.enable()
+
+    def pause(self):
+        self.profile.disable()
+
+    def dump(self, path):
+        self.profile.dump_stats(path)
+
+
+class SampleCapture:
+    """Stack samples of one thread taken every `interval` seconds while
+    resumed; dumped as collapsed stacks (`a;b;c count`) for flame graphs
+    """
+
+    suffix = 'collapsed'
+
+    def __init__(self, interval=PROFILE_SAMPLE_INTERVAL, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks = Counter()
+        self.active = threading.Event()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._sample, name='profile-sampler', daemon=True)
+        self.thread.start()
+
+    def _sample(self):
+        while not self.stopped.is_set():
+            if self.active.wait(0.1):
+                frame = sys._current_frames().get(self.thread_id)
+                if frame is not None:
+                    self.stacks[self._collapse(frame)] += 1
+                time_module.sleep(self.interval)
+
+    @staticmethod
+    def _collapse(frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+    def resume(self):
+        self.active.set()
+
+    def pause(self):
+        self.active.clear()
+
+    def dump(self, path):
+        self.stopped.set()
+        self.active.clear()
+        self.thread.join()
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+CAPTURES = {'cprofile': CProfileCapture, 'sample': SampleCapture}
+
+
+# ==================== Profiler ====================
+class Profiler:
+    """Captures the next N scheduler cycles when armed
+
+    Without targets the whole cycle is captured. With targets (e.g.
+    "TechnicalAnalyzer.analyze_candle,DataFetcher.fetch_all") only those
+    calls are, one file per target per cycle. Only one target is captured
+    at a time (a nested or concurrent target call runs uncaptured, and
+    shows up inside the outer one). For async targets the capture also
+    sees other tasks that run while the call is suspended.
+    Nothing is wrapped unless targets are given, and wrappers only call
+    through while disarmed.
+    """
+
+    def __init__(self, mode=PROFILE_MODE, cycles=PROFILE_CYCLES, directory=PROFILE_DIR,
+                 targets=PROFILE_TARGETS):
+        if mode not in CAPTURES:
+            raise ValueError(f"Unknown profile mode '{mode}'. Known: {', '.join(CAPTURES)}")
+        self.mode = mode
+        self.cycles = cycles
+        self.directory = directory
+        self.targets = [t.strip() for t in targets.split(',') if t.strip()] if targets else []
+        self.remaining = 0
+        self.active = False  # inside an armed cycle
+        self.current = None  # target being captured
+        self.captures = {}
+        self.installed = []
+        self.files = []
+
+    @property
+    def armed(self):
+        return self.remaining > 0
+
+    def arm(self, cycles=None):
+        self.remaining = cycles or self.cycles
+        logger.info(f"🔬 Profiling next {self.remaining} cycle(s) ({self.mode}"
+                    f"{', ' + ', '.join(self.targets) if self.targets else ''})")
+
+    def disarm(self):
+        self.remaining = 0
+        logger.info("🔬 Profiling off")
+
+    def toggle(self):
+        self.disarm() if self.armed else self.arm()
+
+    def install(self):
+        """Wrap targets, hook SIGUSR1 and honour the PROFILE env flag"""
+        for target in self.targets:
+            self._wrap(target)
+        if hasattr(signal, 'SIGUSR1'):
+            try:
+                asyncio.get_running_loop().add_signal_handler(signal.SIGUSR1, self.toggle)
+            except (RuntimeError, NotImplementedError, ValueError):
+                pass
+        if PROFILE_ENABLED:
+            self.arm()
+
+    def uninstall(self):
+        for owner, name, original in reversed(self.installed):
+            setattr(owner, name, original)
+        self.installed = []
+
+    # ---------- Target wrapping ----------
+    @staticmethod
+    def _resolve(target):
+        """(owner, attribute name) for "Class.method" or "module.function" """
+        head, _, name = target.rpartition('.')
+        if head in TARGET_MODULES:
+            return importlib.import_module(head), name
+        for module_name in TARGET_MODULES:
+            owner = getattr(importlib.import_module(module_name), head, None)
+            if inspect.isclass(owner):
+                return owner, name
+        raise ValueError(f"Profile target '{target}' not found in {', '.join(TARGET_MODULES)}")
+
+    def _wrap(self, target):
+        owner, name = self._resolve(target)
+        raw = inspect.getattr_static(owner, name)
+        func = raw.__func__ if isinstance(raw, (staticmethod, classmethod)) else raw
+        profiler = self
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                if not profiler.active or profiler.current is not None:
+                    return await func(*args, **kwargs)
+                capture = profiler._start(target)
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    profiler._stop(capture)
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not profiler.active or profiler.current is not None:
+                    return func(*args, **kwargs)
+                capture = profiler._start(target)
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    profiler._stop(capture)
+
+        if isinstance(raw, staticmethod):
+            wrapper = staticmethod(wrapper)
+        elif isinstance(raw, classmethod):
+            wrapper = classmethod(wrapper)
+        setattr(owner, name, wrapper)
+        self.installed.append((owner, name, raw))
+
+    def _capture(self, label):
+        capture = self.captures.get(label)
+        if capture is None:
+            capture = self.captures[label] = CAPTURES[self.mode]()
+        return capture
+
+    def _start(self, target):
+        self.current = target
+        capture = self._capture(target)
+        capture.resume()
+        return capture
+
+    def _stop(self, capture):
+        capture.pause()
+        self.current = None
+
+    # ---------- Cycle scope ----------
+    @contextmanager
+    def cycle(self, stamp):
+        """Wrap one scheduler cycle; `stamp` (datetime) names the output files"""
+        if not self.remaining:
+            yield
+            return
+
+        self.active = True
+        whole = None if self.targets else self._capture('cycle')
+        if whole:
+            whole.resume()
+        try:
+            yield
+        finally:
+            if whole:
+                whole.pause()
+            self.active = False
+            self._dump(stamp)
+            self.remaining = max(0, self.remaining - 1)
+            if not self.remaining:
+                logger.info(f"🔬 Profiling done: {len(self.files)} file(s) in {self.directory}")
+
+    def _dump(self, stamp):
+        os.makedirs(self.directory, exist_ok=True)
+        for label, capture in self.captures.items():
+            path = os.path.join(self.directory, f"{stamp:%Y%m%d_%H%M%S}_{label}.{capture.suffix}")
+            capture.dump(path)
+            self.files.append(path)
+        self.captures = {}
@@ -0,0 +1,131 @@
+"""
+Rate Limiter: Token buckets per Upstox endpoint class
+Per-second and per-minute budgets, response-header hints and 429 back-off
+"""
+
+import asyncio
+import time as time_module
+
+from config import RATE_LIMITS, RATE_LIMIT_PENALTY_SECONDS, RATE_LIMIT_MIN_SCALE
+from utils import setup_logger
+
+logger = setup_logger("ratelimit")
+
+
+# ==================== Token Bucket ====================
+class TokenBucket:
+    """`rate` tokens/second up to `capacity`
+
+    `reserve()` takes a token immediately (the balance may go negative)
+    and returns how long the caller must wait for it. It never awaits, so
+    concurrent coroutines on one loop can't double-spend a token.
+    """
+
+    def __init__(self, rate, capacity, now):
+        self.base_rate = rate
+        self.base_capacity = capacity
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, now):
+        self._refill(now)
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def scale(self, factor):
+        """Shrink/restore rate and capacity relative to the configured budget"""
+        self.rate = self.base_rate * factor
+        self.capacity = max(1.0, self.base_capacity * factor)
+        self.tokens = min(self.tokens, self.capacity)
+
+    def clamp(self, remaining):
+        """Trust the server's remaining count if it is lower than ours"""
+        self.tokens = min(self.tokens, remaining)
+
+
+class EndpointLimiter:
+    """Per-second and per-minute buckets for one endpoint class"""
+
+    def __init__(self, name, per_second, per_minute, now):
+        self.name = name
+        self.second = TokenBucket(per_second, per_second, now)
+        self.minute = TokenBucket(per_minute / 60, per_minute, now)
+        self.blocked_until = 0.0
+        self.penalty_until = 0.0
+        self.factor = 1.0
+        self.throttled = 0
+
+    def reserve(self, now):
+        if self.factor < 1.0 and now >= self.penalty_until:
+            self._set_factor(1.0)
+            logger.info(f"✅ Rate budget restored: {self.name}")
+
+        return max(self.blocked_until - now, self.second.reserve(now), self.minute.reserve(now))
+
+    def _set_factor(self, factor):
+        self.factor = factor
+        self.second.scale(factor)
+        self.minute.scale(factor)
+
+    def on_throttled(self, now, retry_after=None):
+        """429: block for Retry-After and halve the budget for a while"""
+        self.throttled += 1
+        self.blocked_until = max(self.blocked_until, now + (retry_after or 2 ** min(self.throttled, 5) / 2))
+        self.penalty_until = now + RATE_LIMIT_PENALTY_SECONDS
+        self._set_factor(max(RATE_LIMIT_MIN_SCALE, self.factor / 2))
+        logger.warning(f"⚠️ 429 on {self.name}: budget x{self.factor:.2f} for {RATE_LIMIT_PENALTY_SECONDS}s")
+
+    def on_headers(self, now, remaining=None, reset=None):
+        if remaining is not None:
+            self.second.clamp(remaining)
+            if remaining <= 0 and reset:
+                self.blocked_until = max(self.blocked_until, now + reset)
+
+
+# ==================== Rate Limiter ====================
+class RateLimiter:
+    """Shared limiter for one API client, keyed by endpoint class"""
+
+    def __init__(self, limits=None, clock=time_module.monotonic):
+        self.limits = limits or RATE_LIMITS
+        self.clock = clock
+        self.endpoints = {}
+
+    def _endpoint(self, name):
+        limiter = self.endpoints.get(name)
+        if limiter is None:
+            per_second, per_minute = self.limits.get(name, self.limits['default'])
+            limiter = self.endpoints[name] = EndpointLimiter(name, per_second, per_minute, self.clock())
+        return limiter
+
+    async def acquire(self, endpoint):
+        """Wait until a request to `endpoint` fits the budget"""
+        delay = self._endpoint(endpoint).reserve(self.clock())
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def observe(self, endpoint, status, headers):
+        """Feed a response's status and rate-limit headers back in"""
+        limiter = self._endpoint(endpoint)
+        now = self.clock()
+        if status == 429:
+            limiter.on_throttled(now, _number(headers.get('Retry-After')))
+        else:
+            limiter.on_headers(now, _number(headers.get('X-RateLimit-Remaining')),
+                               _number(headers.get('X-RateLimit-Reset')))
+
+    def stats(self):
+        return {name: {'factor': e.factor, 'throttled': e.throttled} for name, e in self.endpoints.items()}
+
+
+def _number(value):
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
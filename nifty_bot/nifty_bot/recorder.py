@@ -0,0 +1,152 @@
+"""
+Session Recorder: Raw Upstox responses per cycle, as gzip JSONL
+One line per cycle: {"ts": ISO time, "responses": {method: {instrument_key: payload}}}
+"""
+
+import gzip
+import json
+import os
+from datetime import datetime
+
+from config import RECORD_DIR
+from data_manager import UpstoxClient
+from instruments import NIFTY
+from utils import setup_logger
+
+logger = setup_logger("recorder")
+
+
+def session_path(day, directory=RECORD_DIR, name=NIFTY.namespace):
+    """Recording file for a trading day, e.g. nifty_20250101.jsonl.gz
+
+    `name` identifies what was recorded: a profile namespace, or several
+    joined with '_' when one scheduler records all its indices.
+    """
+    return os.path.join(directory, f"{name}_{day:%Y%m%d}.jsonl.gz")
+
+
+# ==================== Recorder ====================
+class SessionRecorder:
+    """Collects one cycle's responses and appends them as a JSON line
+
+    The file is opened in append mode, so a restarted bot adds a new gzip
+    member to the same day's file; gzip readers see one continuous stream.
+    """
+
+    def __init__(self, directory=RECORD_DIR, name=NIFTY.namespace):
+        self.directory = directory
+        self.name = name
+        self.file = None
+        self.day = None
+        self.cycle_ts = None
+        self.responses = {}
+        self.cycles = 0
+
+    def begin_cycle(self, now):
+        self.cycle_ts = now
+        self.responses = {}
+
+    def record(self, method, key, payload):
+        if self.cycle_ts is not None:
+            self.responses.setdefault(method, {})[key] = payload
+
+    def end_cycle(self):
+        """Write the cycle (if anything was fetched) and flush to disk"""
+        if self.cycle_ts is None or not self.responses:
+            self.cycle_ts = None
+            return
+
+        self._open_for(self.cycle_ts.date())
+        line = json.dumps({'ts': self.cycle_ts.isoformat(), 'responses': self.responses},
+                          separators=(',', ':'))
+        self.file.write(line + '\n')
+        self.file.flush()
+        self.cycles += 1
+        self.cycle_ts = None
+        self.responses = {}
+
+    def _open_for(self, day):
+        if self.day == day and self.file:
+            return
+        self.close()
+        os.makedirs(self.directory, exist_ok=True)
+        path = session_path(day, self.directory, self.name)
+        self.file = gzip.open(path, 'at', encoding='utf-8')
+        self.day = day
+        logger.info(f"🎙️ Recording session to {path}")
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
+class RecordingClient(UpstoxClient):
+    """UpstoxClient that copies every response into a SessionRecorder"""
+
+    def __init__(self, recorder):
+        super().__init__()
+        self.recorder = recorder
+
+    async def get_quote(self, instrument_key):
+        data = await super().get_quote(instrument_key)
+        self.recorder.record('get_quote', instrument_key, data)
+        return data
+
+    async def get_candles(self, instrument_key, interval='1minute'):
+        data = await super().get_candles(instrument_key, interval)
+        self.recorder.record('get_candles', instrument_key, data)
+        return data
+
+    async def get_option_chain(self, instrument_key, expiry_date):
+        data = await super().get_option_chain(instrument_key, expiry_date)
+        self.recorder.record('get_option_chain', instrument_key, data)
+        return data
+
+
+# ==================== Playback ====================
+def load_session(path):
+    """Yield (timestamp, responses) for each recorded cycle"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                cycle = json.loads(line)
+                yield datetime.fromisoformat(cycle['ts']), cycle['responses']
+
+
+class ReplayClient:
+    """Drop-in for UpstoxClient that answers from one recorded cycle
+
+    Lookups are by method and instrument key; if the key differs (e.g. the
+    futures contract was resolved on another date) and the method only has
+    one recorded instrument, that one is served.
+    """
+
+    def __init__(self):
+        self.responses = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    def load_cycle(self, responses):
+        self.responses = responses
+
+    def _get(self, method, key):
+        recorded = self.responses.get(method) or {}
+        if key in recorded:
+            return recorded[key]
+        if len(recorded) == 1:
+            return next(iter(recorded.values()))
+        return None
+
+    async def get_quote(self, instrument_key):
+        return self._get('get_quote', instrument_key)
+
+    async def get_candles(self, instrument_key, interval='1minute'):
+        return self._get('get_candles', instrument_key)
+
+    async def get_option_chain(self, instrument_key, expiry_date):
+        return self._get('get_option_chain', instrument_key)
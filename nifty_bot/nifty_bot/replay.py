@@ -0,0 +1,101 @@
+"""
+Session Replay: Drive the bot's cycle from a recorded session
+Same DataFetcher -> analyzers -> SignalGenerator -> PositionTracker path, no sleeps
+
+Usage: python replay.py recordings/nifty_20250101.jsonl.gz [--verbose]
+"""
+
+import argparse
+import asyncio
+import logging
+import time as time_module
+from dataclasses import dataclass, field
+
+from clock import SimulatedClock, set_clock
+from main import NiftyTradingBot
+from recorder import ReplayClient, load_session
+from utils import setup_logger
+
+logger = setup_logger("replay")
+
+
+@dataclass
+class ReplayResult:
+    """Outcome of one replayed session"""
+    cycles: int = 0
+    elapsed: float = 0.0
+    positions: list = field(default_factory=list)
+    open_position: object = None
+
+    @property
+    def total_pnl(self):
+        return sum(p.get_profit_loss() for p in self.positions)
+
+
+async def replay_session(path, bot_factory=NiftyTradingBot, verbose=False):
+    """Replay every recorded cycle through a bot built by `bot_factory`
+
+    A SimulatedClock is set to each cycle's recorded time, Redis is not
+    connected (RAM ring only) and Telegram is disabled.
+    """
+    result = ReplayResult()
+    bot = None
+    client = ReplayClient()
+    clock = None
+    previous_clock = None
+    start = time_module.perf_counter()
+
+    if not verbose:
+        logging.disable(logging.INFO)
+    try:
+        for ts, responses in load_session(path):
+            if clock is None:
+                clock = SimulatedClock(ts)
+                previous_clock = set_clock(clock)
+            clock.set(ts)
+            if bot is None:
+                bot = bot_factory()  # built at first cycle time so warmup matches live
+                bot.telegram.enabled = False
+                bot.attach(client)
+
+            client.load_cycle(responses)
+            try:
+                await bot._cycle()
+            except Exception as e:
+                logger.error(f"❌ Replay cycle {ts:%H:%M} error: {e}", exc_info=verbose)
+            result.cycles += 1
+    finally:
+        if clock is not None:
+            set_clock(previous_clock)
+        logging.disable(logging.NOTSET)
+
+    result.elapsed = time_module.perf_counter() - start
+    if bot is not None:
+        result.positions = list(bot.position_tracker.closed_positions)
+        result.open_position = bot.position_tracker.active_position
+    return result
+
+
+def print_report(result):
+    print(f"Replayed {result.cycles} cycles in {result.elapsed:.2f}s")
+    for p in result.positions:
+        print(f"  {p.entry_time:%H:%M} -> {p.exit_time:%H:%M}  {p.signal.signal_type.value:6s} "
+              f"{p.entry_premium:8.2f} -> {p.exit_premium:8.2f}  "
+              f"{p.get_profit_percent():+6.2f}%  {p.exit_reason}")
+    if result.open_position:
+        p = result.open_position
+        print(f"  {p.entry_time:%H:%M} -> open   {p.signal.signal_type.value:6s} {p.entry_premium:8.2f}")
+    print(f"Trades: {len(result.positions)}, P&L: {result.total_pnl:+.2f} pts")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('path', help='recorded session (.jsonl.gz)')
+    parser.add_argument('--verbose', action='store_true', help='keep per-cycle logs')
+    args = parser.parse_args()
+
+    print_report(await replay_session(args.path, verbose=args.verbose))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
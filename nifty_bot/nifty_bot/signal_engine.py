@@ -13,8 +13,11 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional
 
+import numpy as np
+
 from config import *
-from utils import IST, setup_logger
+from instruments import NIFTY
+from utils import IST, setup_logger, get_ist_time
 
 logger = setup_logger("signal_engine")
 
@@ -65,9 +68,10 @@ class Signal:
 
 # ==================== Signal Generator ====================
 class SignalGenerator:
-    """Generate entry signals"""
+    """Generate entry signals; point thresholds come from `profile`"""
     
-    def __init__(self):
+    def __init__(self, profile=NIFTY):
+        self.profile = profile
         self.last_signal_time = None
     
     def generate(self, **kwargs):
@@ -106,8 +110,8 @@ class SignalGenerator:
         
         # Bonus checks
         bonus_5m = ce_total_5m < -OI_5M_THRESHOLD and has_5m_total
-        bonus_candle = candle_data.get('size', 0) >= MIN_CANDLE_SIZE
-        bonus_vwap = vwap_distance >= VWAP_BUFFER
+        bonus_candle = candle_data.get('size', 0) >= self.profile.min_candle_size
+        bonus_vwap = vwap_distance >= self.profile.vwap_buffer
         bonus_pcr = pcr > PCR_BULLISH
         bonus_momentum = momentum.get('consecutive_green', 0) >= 2
         bonus_flow = order_flow < 1.0
@@ -139,7 +143,7 @@ class SignalGenerator:
         
         signal = Signal(
             signal_type=SignalType.CE_BUY,
-            timestamp=datetime.now(IST),
+            timestamp=get_ist_time(),
             entry_price=entry,
             target_price=target,
             stop_loss=sl,
@@ -168,9 +172,82 @@ class SignalGenerator:
             }
         )
         
-        self.last_signal_time = datetime.now(IST)
+        self.last_signal_time = get_ist_time()
         return signal
     
+    @staticmethod
+    def _side_batch(c, profile, oi_15m, atm_15m, oi_5m, price_ok, color_ok, pcr_ok, momentum_ok, flow_ok):
+        """Primary/bonus checks and confidence for one side, every bar"""
+        primary_oi = (oi_15m < -OI_THRESHOLD_MEDIUM) & c['has_15m_total']
+        primary_atm = (atm_15m < -ATM_OI_THRESHOLD) & c['has_15m_atm']
+        primary_vol = c['volume_spike']
+        primary = primary_oi.astype(np.int64) + primary_atm + primary_vol
+        
+        bonus = (((oi_5m < -OI_5M_THRESHOLD) & c['has_5m_total']).astype(np.int64)
+                 + (c['candle_size'] >= profile.min_candle_size)
+                 + (c['vwap_distance'] >= profile.vwap_buffer)
+                 + pcr_ok + momentum_ok + flow_ok + c['multi_tf'] + c['gamma_zone'])
+        
+        confidence = (50 + 20 * primary_oi + 15 * primary_atm + 10 * primary_vol
+                      + 3 * color_ok + 2 * price_ok + 2 * bonus)
+        confidence = np.minimum(confidence, 98)
+        
+        ok = (primary >= MIN_PRIMARY_CHECKS) & (confidence >= MIN_CONFIDENCE)
+        return ok, confidence, primary, bonus, primary_oi, primary_atm
+    
+    @staticmethod
+    def generate_batch(columns, profile=NIFTY):
+        """generate() for every bar of a session at once -> SignalBatch
+        
+        `columns` maps generate()'s scalar kwargs to equal-length arrays,
+        with the dict kwargs flattened: candle_color (+1 green, -1 red,
+        0 other), candle_size, consecutive_green, consecutive_red, and
+        ce_ltp / pe_ltp (NaN = missing). No cooldown is applied here.
+        """
+        flags = ('has_5m_total', 'has_15m_total', 'has_5m_atm', 'has_15m_atm',
+                 'volume_spike', 'multi_tf', 'gamma_zone')
+        c = {name: np.asarray(values) for name, values in columns.items()}
+        c.update({name: c[name].astype(bool) for name in flags})
+        
+        futures, vwap, pcr, flow = c['futures_price'], c['vwap'], c['pcr'], c['order_flow']
+        ce = SignalGenerator._side_batch(
+            c, profile, c['ce_total_15m'], c['atm_ce_15m'], c['ce_total_5m'],
+            futures > vwap, c['candle_color'] == 1, pcr > PCR_BULLISH,
+            c['consecutive_green'] >= 2, flow < 1.0)
+        pe = SignalGenerator._side_batch(
+            c, profile, c['pe_total_15m'], c['atm_pe_15m'], c['pe_total_5m'],
+            futures < vwap, c['candle_color'] == -1, pcr < PCR_BEARISH,
+            c['consecutive_red'] >= 2, flow > 1.5)
+        
+        # CE is tried first, PE only where CE did not fire
+        use_ce = ce[0]
+        use_pe = pe[0] & ~use_ce
+        pick = lambda i: np.where(use_ce, ce[i], pe[i])
+        
+        # Levels (int() truncation as in the scalar path)
+        sl_mult = np.where(c['gamma_zone'], ATR_SL_GAMMA_MULTIPLIER, ATR_SL_MULTIPLIER)
+        target_offset = np.trunc(c['atr'] * ATR_TARGET_MULTIPLIER)
+        sl_offset = np.trunc(c['atr'] * sl_mult)
+        direction = np.where(use_ce, 1.0, -1.0)
+        
+        ltp = np.where(use_ce, c['ce_ltp'], c['pe_ltp'])
+        premium = np.where(np.isnan(ltp), 150.0, ltp)
+        premium_sl = premium * (1 - PREMIUM_SL_PERCENT / 100) if USE_PREMIUM_SL else np.zeros_like(premium)
+        
+        return SignalBatch(
+            columns=c,
+            signal_type=use_ce.astype(np.int8) - use_pe.astype(np.int8),
+            confidence=pick(1),
+            primary_checks=pick(2),
+            bonus_checks=pick(3),
+            primary_oi=pick(4),
+            primary_atm=pick(5),
+            target=futures + direction * target_offset,
+            stop_loss=futures - direction * sl_offset,
+            premium=premium,
+            premium_sl=premium_sl
+        )
+    
     def _check_pe_buy(self, spot_price, futures_price, vwap, vwap_distance, pcr, atr,
                       atm_strike, atm_data, ce_total_5m, pe_total_5m, ce_total_15m, pe_total_15m,
                       atm_ce_5m, atm_pe_5m, atm_ce_15m, atm_pe_15m,
@@ -195,8 +272,8 @@ class SignalGenerator:
         
         # Bonus checks
         bonus_5m = pe_total_5m < -OI_5M_THRESHOLD and has_5m_total
-        bonus_candle = candle_data.get('size', 0) >= MIN_CANDLE_SIZE
-        bonus_vwap = vwap_distance >= VWAP_BUFFER
+        bonus_candle = candle_data.get('size', 0) >= self.profile.min_candle_size
+        bonus_vwap = vwap_distance >= self.profile.vwap_buffer
         bonus_pcr = pcr < PCR_BEARISH
         bonus_momentum = momentum.get('consecutive_red', 0) >= 2
         bonus_flow = order_flow > 1.5
@@ -228,7 +305,7 @@ class SignalGenerator:
         
         signal = Signal(
             signal_type=SignalType.PE_BUY,
-            timestamp=datetime.now(IST),
+            timestamp=get_ist_time(),
             entry_price=entry,
             target_price=target,
             stop_loss=sl,
@@ -257,10 +334,74 @@ class SignalGenerator:
             }
         )
         
-        self.last_signal_time = datetime.now(IST)
+        self.last_signal_time = get_ist_time()
         return signal
 
 
+# ==================== Batch Signals ====================
+@dataclass
+class SignalBatch:
+    """Per-bar generate() results for a whole session"""
+    columns: dict
+    signal_type: np.ndarray  # +1 CE_BUY, -1 PE_BUY, 0 none
+    confidence: np.ndarray
+    primary_checks: np.ndarray
+    bonus_checks: np.ndarray
+    primary_oi: np.ndarray
+    primary_atm: np.ndarray
+    target: np.ndarray
+    stop_loss: np.ndarray
+    premium: np.ndarray
+    premium_sl: np.ndarray
+    
+    def __len__(self):
+        return len(self.signal_type)
+    
+    def signal(self, i, timestamp):
+        """Signal for bar i, identical to what generate() returns (or None)"""
+        side = int(self.signal_type[i])
+        if side == 0:
+            return None
+        
+        c = self.columns
+        is_ce = side == 1
+        primary_oi = bool(self.primary_oi[i])
+        primary_atm = bool(self.primary_atm[i])
+        primary_vol = bool(c['volume_spike'][i])
+        prefix = 'ce' if is_ce else 'pe'
+        
+        return Signal(
+            signal_type=SignalType.CE_BUY if is_ce else SignalType.PE_BUY,
+            timestamp=timestamp,
+            entry_price=float(c['futures_price'][i]),
+            target_price=float(self.target[i]),
+            stop_loss=float(self.stop_loss[i]),
+            atm_strike=int(c['atm_strike'][i]),
+            recommended_strike=int(c['atm_strike'][i]),
+            option_premium=float(self.premium[i]),
+            premium_sl=float(self.premium_sl[i]),
+            vwap=float(c['vwap'][i]),
+            atr=float(c['atr'][i]),
+            oi_5m=float(c[f'{prefix}_total_5m'][i]),
+            oi_15m=float(c[f'{prefix}_total_15m'][i]),
+            atm_ce_change=float(c['atm_ce_15m'][i]),
+            atm_pe_change=float(c['atm_pe_15m'][i]),
+            pcr=float(c['pcr'][i]),
+            volume_spike=primary_vol,
+            volume_ratio=float(c['volume_ratio'][i]),
+            order_flow=float(c['order_flow'][i]),
+            confidence=int(self.confidence[i]),
+            primary_checks=int(self.primary_checks[i]),
+            bonus_checks=int(self.bonus_checks[i]),
+            trailing_sl_enabled=ENABLE_TRAILING_SL,
+            is_expiry_day=bool(c['gamma_zone'][i]),
+            analysis_details={
+                'primary': {f'{prefix}_unwinding': primary_oi, 'atm_unwinding': primary_atm, 'volume': primary_vol},
+                'bonus_count': int(self.bonus_checks[i])
+            }
+        )
+
+
 # ==================== Signal Validator ====================
 class SignalValidator:
     """Validate and manage signal cooldown"""
@@ -290,17 +431,48 @@ class SignalValidator:
             logger.warning(f"⚠️ Low confidence: {signal.confidence}%")
             return None
         
-        self.last_signal_time = datetime.now(IST)
+        self.last_signal_time = get_ist_time()
         self.signal_count += 1
         
         return signal
     
+    def validate_batch(self, batch, timestamps, eligible=None):
+        """Cooldown/R:R pass over a SignalBatch -> bool mask of accepted bars
+        
+        Same rules and order as validate() applied bar by bar; only bars
+        with a signal (and `eligible`, if given) are visited.
+        """
+        accepted = np.zeros(len(batch), dtype=bool)
+        candidates = batch.signal_type != 0
+        if eligible is not None:
+            candidates &= np.asarray(eligible, dtype=bool)
+        
+        entry = batch.columns['futures_price']
+        last = None if self.last_signal_time is None else self.last_signal_time.timestamp()
+        for i in np.flatnonzero(candidates):
+            if last is not None and timestamps[i] - last < SIGNAL_COOLDOWN_SECONDS:
+                continue
+            
+            risk = abs(entry[i] - batch.stop_loss[i])
+            reward = abs(batch.target[i] - entry[i])
+            rr = round(reward / risk, 2) if risk > 0 else 0.0
+            if rr < 1.0 or batch.confidence[i] < MIN_CONFIDENCE:
+                continue
+            
+            accepted[i] = True
+            last = timestamps[i]
+            self.signal_count += 1
+        
+        if accepted.any():
+            self.last_signal_time = datetime.fromtimestamp(last, IST)
+        return accepted
+    
     def _check_cooldown(self):
         """Check cooldown period"""
         if self.last_signal_time is None:
             return True
         
-        elapsed = (datetime.now(IST) - self.last_signal_time).total_seconds()
+        elapsed = (get_ist_time() - self.last_signal_time).total_seconds()
         return elapsed >= SIGNAL_COOLDOWN_SECONDS
     
     def get_cooldown_remaining(self):
@@ -308,6 +480,6 @@ class SignalValidator:
         if self.last_signal_time is None:
             return 0
         
-        elapsed = (datetime.now(IST) - self.last_signal_time).total_seconds()
+        elapsed = (get_ist_time() - self.last_signal_time).total_seconds()
         return max(0, int(SIGNAL_COOLDOWN_SECONDS - elapsed))
 
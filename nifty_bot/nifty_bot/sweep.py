@@ -0,0 +1,402 @@
+"""
+Parameter Sweep: Rank threshold sets over recorded sessions
+Features are extracted once per session, shared with a process pool, and
+each parameter set re-runs only the signal/exit logic.
+
+Usage:
+  python sweep.py recordings/*.jsonl.gz \\
+      --param OI_THRESHOLD_MEDIUM=1.0,1.5,2.0 --param MIN_CONFIDENCE=60:85:5 \\
+      [--random 500] [--workers 8] [--top 20] [--out results.csv]
+"""
+
+import argparse
+import asyncio
+import csv
+import logging
+import math
+import os
+import random
+import time as time_module
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import config
+import instruments
+import position_tracker
+import signal_engine
+from clock import IST, SimulatedClock, set_clock
+from main import NiftyTradingBot
+from replay import replay_session
+from signal_engine import SignalGenerator, SignalValidator
+from position_tracker import PositionTracker
+from utils import get_ist_time
+
+# Modules whose config-imported globals a parameter set overrides
+# (instruments scales the per-profile point thresholds from its copies)
+PARAM_MODULES = (signal_engine, position_tracker, instruments)
+
+# Settings read at sweep time by SignalGenerator.generate_batch,
+# SignalValidator.validate_batch and PositionTracker. Anything else (ATR
+# period, strike windows, ...) is baked into the precomputed features.
+SWEEP_PARAMS = (
+    'OI_THRESHOLD_MEDIUM', 'OI_5M_THRESHOLD', 'ATM_OI_THRESHOLD', 'PCR_BULLISH', 'PCR_BEARISH',
+    'VWAP_BUFFER', 'MIN_CANDLE_SIZE', 'MIN_PRIMARY_CHECKS', 'MIN_CONFIDENCE',
+    'ATR_TARGET_MULTIPLIER', 'ATR_SL_MULTIPLIER', 'ATR_SL_GAMMA_MULTIPLIER',
+    'USE_PREMIUM_SL', 'PREMIUM_SL_PERCENT', 'SIGNAL_COOLDOWN_SECONDS',
+    'ENABLE_TRAILING_SL', 'TRAILING_SL_DISTANCE',
+    'EXIT_OI_REVERSAL_THRESHOLD', 'EXIT_VOLUME_DRY_THRESHOLD', 'EXIT_PREMIUM_DROP_PERCENT'
+)
+
+# Applied by the sweep itself: volume_spike is re-derived from volume_ratio
+DERIVED_PARAMS = ('VOL_SPIKE_MULTIPLIER',)
+
+FEATURES = [
+    'ts', 'signal_time',
+    'spot_price', 'futures_price', 'vwap', 'vwap_distance', 'pcr', 'atr', 'atm_strike',
+    'ce_ltp', 'pe_ltp',
+    'ce_total_5m', 'pe_total_5m', 'ce_total_15m', 'pe_total_15m',
+    'atm_ce_5m', 'atm_pe_5m', 'atm_ce_15m', 'atm_pe_15m',
+    'has_5m_total', 'has_15m_total', 'has_5m_atm', 'has_15m_atm',
+    'volume_ratio', 'order_flow',
+    'candle_color', 'candle_size', 'candle_rejection', 'candle_rejection_type',
+    'consecutive_green', 'consecutive_red', 'gamma_zone', 'multi_tf'
+]
+COL = {name: i for i, name in enumerate(FEATURES)}
+
+_COLORS = {'GREEN': 1, 'RED': -1, 'DOJI': 0, 'UNKNOWN': 2}
+_COLOR_NAMES = {v: k for k, v in _COLORS.items()}
+_REJECTIONS = {'upper': 1, 'lower': -1, None: 0}
+_REJECTION_NAMES = {v: k for k, v in _REJECTIONS.items()}
+
+
+# ==================== Feature Extraction ====================
+def encode_inputs(ts, signal_time, inputs):
+    """One cycle's generate() kwargs -> feature row"""
+    atm = inputs['atm_data'] or {}
+    candle = inputs['candle_data']
+    momentum = inputs['momentum']
+    row = [ts.timestamp(), signal_time]
+    for name in FEATURES[2:]:
+        if name in ('ce_ltp', 'pe_ltp'):
+            row.append(atm.get(name, math.nan))
+        elif name == 'candle_color':
+            row.append(_COLORS.get(candle.get('color'), 2))
+        elif name == 'candle_size':
+            row.append(candle.get('size', 0))
+        elif name == 'candle_rejection':
+            row.append(bool(candle.get('rejection')))
+        elif name == 'candle_rejection_type':
+            row.append(_REJECTIONS.get(candle.get('rejection_type'), 0))
+        elif name in ('consecutive_green', 'consecutive_red'):
+            row.append(momentum.get(name, 0))
+        else:
+            row.append(inputs[name])
+    return row
+
+
+def decode_row(row):
+    """Feature row -> (datetime, signal_time, generate() kwargs minus volume_spike)"""
+    get = lambda name: float(row[COL[name]])
+    flag = lambda name: bool(row[COL[name]])
+
+    atm_data = {k: get(k) for k in ('ce_ltp', 'pe_ltp') if not math.isnan(row[COL[k]])}
+    inputs = {name: get(name) for name in (
+        'spot_price', 'futures_price', 'vwap', 'vwap_distance', 'pcr', 'atr',
+        'ce_total_5m', 'pe_total_5m', 'ce_total_15m', 'pe_total_15m',
+        'atm_ce_5m', 'atm_pe_5m', 'atm_ce_15m', 'atm_pe_15m', 'volume_ratio', 'order_flow')}
+    inputs.update({name: flag(name) for name in (
+        'has_5m_total', 'has_15m_total', 'has_5m_atm', 'has_15m_atm', 'gamma_zone', 'multi_tf')})
+    inputs['atm_strike'] = int(get('atm_strike'))
+    inputs['atm_data'] = atm_data
+    inputs['candle_data'] = {
+        'color': _COLOR_NAMES[int(get('candle_color'))],
+        'size': get('candle_size'),
+        'rejection': flag('candle_rejection'),
+        'rejection_type': _REJECTION_NAMES[int(get('candle_rejection_type'))]
+    }
+    inputs['momentum'] = {
+        'consecutive_green': int(get('consecutive_green')),
+        'consecutive_red': int(get('consecutive_red'))
+    }
+    ts = datetime.fromtimestamp(get('ts'), IST)
+    return ts, flag('signal_time'), inputs
+
+
+class FeatureBot(NiftyTradingBot):
+    """Bot that records each warmed-up cycle's inputs instead of trading"""
+
+    def __init__(self, rows):
+        super().__init__()
+        self.rows = rows
+
+    def _step_position(self, inputs, signal_time):
+        self.rows.append(encode_inputs(get_ist_time(), signal_time, inputs))
+        return None, None
+
+
+def extract_features(path):
+    """Replay one session -> (n_cycles, len(FEATURES)) float64 array"""
+    rows = []
+    asyncio.run(replay_session(path, bot_factory=lambda: FeatureBot(rows)))
+    return np.array(rows, dtype=np.float64).reshape(-1, len(FEATURES))
+
+
+# ==================== Shared Feature Table ====================
+class FeatureTable:
+    """All sessions' features in one shared-memory block
+
+    Rows of session i are table[offsets[i]:offsets[i + 1]]. Workers attach
+    by name, so the table is never pickled per task.
+    """
+
+    def __init__(self, arrays):
+        sizes = [len(a) for a in arrays]
+        self.offsets = np.concatenate(([0], np.cumsum(sizes))).tolist()
+        self.shape = (self.offsets[-1], len(FEATURES))
+        nbytes = max(int(np.prod(self.shape)) * 8, 1)
+        self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        table = np.ndarray(self.shape, dtype=np.float64, buffer=self.shm.buf)
+        for array, start in zip(arrays, self.offsets):
+            table[start:start + len(array)] = array
+
+    @property
+    def spec(self):
+        return self.shm.name, self.shape, self.offsets
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def attach_table(spec):
+    """(shm, table view, per-session views) for a FeatureTable spec"""
+    name, shape, offsets = spec
+    shm = shared_memory.SharedMemory(name=name)
+    table = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    sessions = [table[a:b] for a, b in zip(offsets, offsets[1:])]
+    return shm, table, sessions
+
+
+# ==================== Evaluation ====================
+_worker = {}
+
+
+def _init_worker(spec):
+    logging.disable(logging.WARNING)
+    shm, table, sessions = attach_table(spec)
+    _worker['shm'] = shm
+    _worker['sessions'] = [
+        ({name: rows[:, i] for i, name in enumerate(FEATURES)}, [decode_row(row) for row in rows])
+        for rows in sessions
+    ]
+    _worker['bot'] = NiftyTradingBot()
+    _worker['clock'] = SimulatedClock(datetime.now(IST))
+    set_clock(_worker['clock'])
+
+
+def apply_params(params):
+    """Override config-derived globals in the signal/exit modules"""
+    for name, value in params.items():
+        if not valid_param(name):
+            raise ValueError(f"{name} is not a sweepable parameter")
+        if name in DERIVED_PARAMS:
+            continue
+        for module in PARAM_MODULES:
+            if hasattr(module, name):
+                setattr(module, name, value)
+
+
+def valid_param(name):
+    return name in SWEEP_PARAMS or name in DERIVED_PARAMS
+
+
+def _run_session(bot, clock, session, spike_multiplier):
+    """Replay one session; returns closed-position P&Ls
+
+    Entry signals for every bar come from one generate_batch() call, so
+    the bar loop only runs while a position is open and otherwise jumps
+    to the next bar with a signal. Exits and the cooldown/R:R validation
+    stay on the scalar path, since they depend on position state.
+    """
+    columns, cycles = session
+    bot.signal_gen = SignalGenerator(bot.profile)
+    bot.signal_validator = SignalValidator()
+    bot.position_tracker = PositionTracker()
+    tracker = bot.position_tracker
+
+    batch = SignalGenerator.generate_batch(
+        dict(columns, volume_spike=columns['volume_ratio'] >= spike_multiplier), bot.profile)
+    entries = (batch.signal_type != 0) & (columns['signal_time'] != 0)
+    candidates = np.flatnonzero(entries)
+
+    i, n = 0, len(cycles)
+    while i < n:
+        if not tracker.has_active_position():
+            k = np.searchsorted(candidates, i)
+            if k == len(candidates):
+                break
+            i = int(candidates[k])
+
+        ts, _, inputs = cycles[i]
+        clock.set(ts)
+        if tracker.has_active_position():
+            bot._step_position(inputs, False)  # exit checks only
+        if not tracker.has_active_position() and entries[i]:
+            signal = bot.signal_validator.validate(batch.signal(i, ts))
+            if signal:
+                tracker.open_position(signal)
+        i += 1
+
+    if tracker.has_active_position() and cycles:
+        current = {'futures_price': cycles[-1][2]['futures_price']}
+        tracker.close_position("Session End", "", tracker._estimate_premium(current, tracker.active_position.signal))
+    return [p.get_profit_loss() for p in tracker.closed_positions]
+
+
+def evaluate(params):
+    """Worker task: metrics for one parameter set over every session"""
+    apply_params(params)
+    spike = params.get('VOL_SPIKE_MULTIPLIER', config.VOL_SPIKE_MULTIPLIER)
+    pnls = []
+    for session in _worker['sessions']:
+        pnls += _run_session(_worker['bot'], _worker['clock'], session, spike)
+    return params, summarize(pnls)
+
+
+def summarize(pnls):
+    """Trade list -> ranking metrics (premium points)"""
+    pnls = np.asarray(pnls, dtype=np.float64)
+    wins = pnls[pnls > 0]
+    losses = pnls[pnls < 0]
+    equity = np.cumsum(pnls)
+    drawdown = float(np.max(np.maximum.accumulate(np.concatenate(([0.0], equity)))[1:] - equity)) if len(pnls) else 0.0
+    return {
+        'trades': int(len(pnls)),
+        'win_rate': round(len(wins) / len(pnls) * 100, 1) if len(pnls) else 0.0,
+        'total_pnl': round(float(pnls.sum()), 2),
+        'avg_pnl': round(float(pnls.mean()), 2) if len(pnls) else 0.0,
+        'profit_factor': round(float(wins.sum() / -losses.sum()), 2) if len(losses) else float('inf') if len(wins) else 0.0,
+        'max_drawdown': round(drawdown, 2)
+    }
+
+
+# ==================== Search Space ====================
+def parse_values(spec):
+    """'1,2,3' or 'lo:hi:step' (inclusive) -> list of numbers"""
+    if ':' in spec:
+        lo, hi, step = (float(x) for x in spec.split(':'))
+        values = np.round(np.arange(lo, hi + step / 2, step), 10).tolist()
+    else:
+        values = [float(x) for x in spec.split(',')]
+    return [int(v) if float(v).is_integer() and '.' not in spec else v for v in values]
+
+
+def build_space(param_specs):
+    space = {}
+    for spec in param_specs:
+        name, _, values = spec.partition('=')
+        space[name.strip()] = parse_values(values)
+    return space
+
+
+def combinations(space, samples=None, seed=0):
+    """Full grid, or `samples` distinct random grid points"""
+    names = list(space)
+    sizes = [len(space[n]) for n in names]
+    total = math.prod(sizes)
+
+    if samples is None or samples >= total:
+        indices = range(total)
+    else:
+        indices = random.Random(seed).sample(range(total), samples)
+
+    for index in indices:
+        combo = {}
+        for name, size in zip(reversed(names), reversed(sizes)):
+            index, i = divmod(index, size)
+            combo[name] = space[name][i]
+        yield {n: combo[n] for n in names}
+
+
+# ==================== Runner ====================
+def run_sweep(paths, space, samples=None, workers=None, seed=0):
+    """Extract features, evaluate every combination, return ranked results"""
+    workers = workers or os.cpu_count()
+    combos = list(combinations(space, samples, seed))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        arrays = list(pool.map(extract_features, paths))
+
+    table = FeatureTable(arrays)
+    try:
+        chunksize = max(1, len(combos) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(table.spec,)) as pool:
+            results = list(pool.map(evaluate, combos, chunksize=chunksize))
+    finally:
+        table.close()
+
+    results.sort(key=lambda r: (r[1]['total_pnl'], -r[1]['max_drawdown']), reverse=True)
+    return results, table.shape[0]
+
+
+def print_table(results, top):
+    if not results:
+        print("No results")
+        return
+    names = list(results[0][0])
+    metrics = list(results[0][1])
+    header = ['#'] + names + metrics
+    rows = [[str(i + 1)] + [str(p[n]) for n in names] + [str(m[k]) for k in metrics]
+            for i, (p, m) in enumerate(results[:top])]
+    widths = [max(len(h), *(len(r[i]) for r in rows)) for i, h in enumerate(header)]
+    print('  '.join(h.rjust(w) for h, w in zip(header, widths)))
+    for row in rows:
+        print('  '.join(c.rjust(w) for c, w in zip(row, widths)))
+
+
+def write_csv(results, path):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        names, metrics = list(results[0][0]), list(results[0][1])
+        writer.writerow(['rank'] + names + metrics)
+        for i, (p, m) in enumerate(results):
+            writer.writerow([i + 1] + [p[n] for n in names] + [m[k] for k in metrics])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('sessions', nargs='+', help='recorded sessions (.jsonl.gz)')
+    parser.add_argument('--param', action='append', default=[], metavar='NAME=SPEC',
+                        help="config constant and values: 'a,b,c' or 'lo:hi:step'")
+    parser.add_argument('--random', type=int, default=None, metavar='N', help='sample N grid points')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--out', help='write all results as CSV')
+    args = parser.parse_args()
+
+    space = build_space(args.param)
+    if not space:
+        parser.error('at least one --param is required')
+    unknown = [n for n in space if not valid_param(n)]
+    if unknown:
+        parser.error(f"not sweepable (features are precomputed, only signal/exit settings apply): "
+                     f"{', '.join(unknown)}. Sweepable: {', '.join(SWEEP_PARAMS + DERIVED_PARAMS)}")
+
+    start = time_module.perf_counter()
+    results, cycles = run_sweep(args.sessions, space, args.random, args.workers, args.seed)
+    elapsed = time_module.perf_counter() - start
+
+    print(f"{len(results)} parameter sets x {len(args.sessions)} sessions "
+          f"({cycles} cycles) in {elapsed:.1f}s\n")
+    print_table(results, args.top)
+    if args.out and results:
+        write_csv(results, args.out)
+
+
+if __name__ == "__main__":
+    main()
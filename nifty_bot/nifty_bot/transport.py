@@ -0,0 +1,117 @@
+"""
+HTTP Transport: Tuned aiohttp session, latency tracking and hedged requests
+Pooled keep-alive connections, DNS cache, per-request deadlines, pre-warm
+"""
+
+import asyncio
+import time as time_module
+from collections import deque
+
+import aiohttp
+
+from config import *
+from utils import setup_logger
+
+logger = setup_logger("transport")
+
+
+# ==================== Session ====================
+def create_session():
+    """ClientSession with a bounded keep-alive pool and per-request timeouts
+
+    Keep-alive outlives SCAN_INTERVAL so one cycle's connections are
+    still open (TCP + TLS done) when the next cycle starts.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_POOL_SIZE,
+        limit_per_host=HTTP_POOL_SIZE,
+        ttl_dns_cache=HTTP_DNS_TTL,
+        keepalive_timeout=HTTP_KEEPALIVE_SECONDS
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=HTTP_REQUEST_TIMEOUT,
+        connect=HTTP_CONNECT_TIMEOUT,
+        sock_read=HTTP_REQUEST_TIMEOUT
+    )
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+
+async def prewarm(session, url, connections=HTTP_PREWARM_CONNECTIONS):
+    """Open `connections` pooled connections to url's host (DNS, TCP, TLS)
+
+    Any HTTP status counts as warm; only connection errors are reported.
+    """
+    async def touch():
+        try:
+            async with session.head(url, allow_redirects=False) as resp:
+                await resp.release()
+                return True
+        except Exception as e:
+            logger.debug(f"Pre-warm failed: {e}")
+            return False
+
+    start = time_module.perf_counter()
+    results = await asyncio.gather(*(touch() for _ in range(connections)))
+    warm = sum(results)
+    logger.info(f"🔥 Pre-warmed {warm}/{connections} connections in "
+                f"{(time_module.perf_counter() - start) * 1000:.0f}ms")
+    return warm
+
+
+# ==================== Latency Tracking ====================
+class LatencyTracker:
+    """Rolling request latencies per endpoint class"""
+
+    def __init__(self, window=HTTP_LATENCY_WINDOW):
+        self.window = window
+        self.samples = {}
+
+    def record(self, endpoint, seconds):
+        samples = self.samples.get(endpoint)
+        if samples is None:
+            samples = self.samples[endpoint] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def percentile(self, endpoint, pct=95):
+        """pct-th percentile in seconds, None until enough samples"""
+        samples = self.samples.get(endpoint)
+        if not samples or len(samples) < HTTP_HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+    def hedge_delay(self, endpoint):
+        """When to send a duplicate request (None = don't hedge yet)"""
+        p95 = self.percentile(endpoint)
+        return None if p95 is None else max(p95, HTTP_HEDGE_MIN_DELAY)
+
+
+# ==================== Hedging ====================
+async def hedged(send, delay):
+    """Run send(); if it hasn't finished after `delay`, race a second send()
+
+    Returns the first result that completes; the loser is cancelled. If
+    the first finisher raised, the other one is still awaited.
+    """
+    if delay is None:
+        return await send()
+
+    tasks = [asyncio.ensure_future(send())]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if done:
+            return tasks[0].result()
+
+        tasks.append(asyncio.ensure_future(send()))
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+        return done.pop().result()
+    finally:
+        # Also runs when the caller is cancelled mid-wait
+        for task in tasks:
+            if not task.done():
+                task.cancel()
@@ -1,4 +1,5 @@
-FILE 2: utils.py (200 lines)
+# ═══════════════════════════════════════════════════════════════════════════════
+# FILE 2: utils.py (200 lines)
 # ═══════════════════════════════════════════════════════════════════════════════
 
 """
@@ -7,8 +8,7 @@ Utilities: Logging, Time Helpers, Validators
 
 import logging
 import sys
-from datetime import datetime
-import pytz
+from collections.abc import Mapping
 
 try:
     import colorlog
@@ -21,9 +21,7 @@ from config import (
     LOG_LEVEL, PREMARKET_START, PREMARKET_END, 
     SIGNAL_START, MARKET_CLOSE
 )
-
-# IST Timezone
-IST = pytz.timezone('Asia/Kolkata')
+from clock import IST, get_clock  # IST shared with the clock
 
 
 # ==================== Logger Setup ====================
@@ -63,8 +61,8 @@ def setup_logger(name="nifty_bot"):
 
 # ==================== Time Utilities ====================
 def get_ist_time():
-    """Get current IST time"""
-    return datetime.now(IST)
+    """Get current IST time (from the installed clock)"""
+    return get_clock().now()
 
 
 def is_premarket():
@@ -124,7 +122,7 @@ def validate_price(price, name="Price"):
 
 def validate_strike_data(strike_data, min_strikes=3):
     """Validate option chain data"""
-    if not strike_data or not isinstance(strike_data, dict):
+    if not strike_data or not isinstance(strike_data, Mapping):
         return False
     if len(strike_data) < min_strikes:
         return False
@@ -140,7 +138,7 @@ def validate_strike_data(strike_data, min_strikes=3):
 
 
 def validate_candle_data(df, min_candles=10):
-    """Validate futures candle DataFrame"""
+    """Validate futures candles (CandleBuffer or DataFrame)"""
     if df is None or len(df) < min_candles:
         return False
     